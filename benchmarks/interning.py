@@ -0,0 +1,94 @@
+"""Memory benchmark for string interning in the loaders.
+
+Generates representative large JSON, XML and YAML inputs (many records with
+the same keys and repeated short values), loads each with and without an
+InternTable and reports the memory retained by the loaded data.
+
+Usage:
+    python benchmarks/interning.py [--records N]
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from config_converter.converter import load_config
+from config_converter.interning import InternTable
+
+
+def _records(count):
+    for i in range(count):
+        yield {
+            "id": str(i),
+            "host": f"db-{i % 16}.internal",
+            "port": "5432",
+            "region": ("eu-west-1", "us-east-1", "ap-south-1")[i % 3],
+            "enabled": "true",
+        }
+
+
+def write_inputs(directory, count):
+    paths = {}
+    paths["json"] = os.path.join(directory, "services.json")
+    with open(paths["json"], "w", encoding="utf-8") as f:
+        json.dump({"services": list(_records(count))}, f)
+
+    paths["xml"] = os.path.join(directory, "services.xml")
+    with open(paths["xml"], "w", encoding="utf-8") as f:
+        f.write("<services>\n")
+        for record in _records(count):
+            f.write(
+                f'  <service id="{record["id"]}" region="{record["region"]}">'
+                f'<host>{record["host"]}</host><port>{record["port"]}</port>'
+                f'<enabled>{record["enabled"]}</enabled></service>\n'
+            )
+        f.write("</services>\n")
+
+    paths["yaml"] = os.path.join(directory, "services.yaml")
+    with open(paths["yaml"], "w", encoding="utf-8") as f:
+        f.write("services:\n")
+        for record in _records(count):
+            f.write(f"  - id: '{record['id']}'\n")
+            for key in ("host", "port", "region", "enabled"):
+                f.write(f"    {key}: '{record[key]}'\n")
+    return paths
+
+
+def measure(path, format, intern_table):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    data = load_config(path, format, intern_table=intern_table)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_inputs(directory, args.records)
+        print(f"{args.records} records per input")
+        print(f"{'format':<8}{'plain MiB':>12}{'interned MiB':>15}{'saved':>8}")
+        for format, path in paths.items():
+            plain, plain_time = measure(path, format, None)
+            interned, interned_time = measure(path, format, InternTable())
+            saved = 1 - interned / plain
+            print(
+                f"{format:<8}{plain / 2**20:>12.1f}{interned / 2**20:>15.1f}"
+                f"{saved:>8.0%}   (load {plain_time:.2f}s -> {interned_time:.2f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
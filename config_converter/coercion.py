@@ -0,0 +1,246 @@
+import json
+import math
+import os
+
+# Schema-driven type coercion.
+# .env, INI and XML sources are loaded as strings only. A JSON schema (or an
+# explicit type map) is compiled once into a flat {path: converter} plan, which
+# is then applied to the loaded data in a single traversal that only visits
+# the branches the plan actually covers.
+
+# Path segment matching any list item or any mapping key
+WILDCARD = "*"
+
+_TRUE_STRINGS = {"true", "yes", "on", "1"}
+_FALSE_STRINGS = {"false", "no", "off", "0"}
+_NULL_STRINGS = {"", "null", "none", "~"}
+
+# Compiled plans, shared by every file converted in this process
+_PLAN_CACHE = {}
+
+
+def _to_integer(value):
+    return int(value.strip())
+
+
+def _to_number(value):
+    try:
+        return int(value.strip())
+    except ValueError:
+        number = float(value)
+    # 'nan' and 'inf' parse as floats but cannot be written as JSON
+    if not math.isfinite(number):
+        raise ValueError(f"Not a finite number: '{value}'")
+    return number
+
+
+def _to_boolean(value):
+    lowered = value.strip().lower()
+    if lowered in _TRUE_STRINGS:
+        return True
+    if lowered in _FALSE_STRINGS:
+        return False
+    raise ValueError(f"Not a boolean: '{value}'")
+
+
+def _to_null(value):
+    if value.strip().lower() in _NULL_STRINGS:
+        return None
+    raise ValueError(f"Not a null value: '{value}'")
+
+
+_CONVERTERS = {
+    "integer": _to_integer,
+    "number": _to_number,
+    "boolean": _to_boolean,
+    "null": _to_null,
+}
+
+
+def _make_converter(types):
+    """Builds a converter for a schema 'type' (a name or a list of names).
+
+    Returns None when no coercion is needed, e.g. when strings are allowed.
+    """
+    if isinstance(types, str):
+        types = [types]
+    if not types or "string" in types:
+        return None
+    steps = [_CONVERTERS[t] for t in types if t in _CONVERTERS]
+    if not steps:
+        return None
+
+    def convert(value):
+        if not isinstance(value, str):
+            return value
+        for step in steps:
+            try:
+                return step(value)
+            except ValueError:
+                continue
+        # Leave the value alone; schema validation reports it if needed
+        return value
+
+    return convert
+
+
+class CoercionPlan:
+    """A compiled, flat mapping of data paths to type converters."""
+
+    def __init__(self, converters, declared=()):
+        self.converters = dict(converters)
+        # Every path on the way to a converter, used to prune the traversal
+        self.prefixes = set()
+        for path in self.converters:
+            for i in range(len(path)):
+                self.prefixes.add(path[:i])
+        # Paths of keys declared in a schema's 'properties'; the wildcard
+        # (from 'additionalProperties') does not apply to them
+        self.declared = frozenset(declared)
+
+    def __len__(self):
+        return len(self.converters)
+
+    def _child_paths(self, paths, key, in_list):
+        """Returns the plan paths matching a child of a node at `paths`.
+
+        Both the exact key and the wildcard are followed, so a '*' rule
+        still applies next to more specific rules for the same parent.
+        """
+        children = []
+        for path in paths:
+            if not in_list:
+                exact = path + (key,)
+                if exact in self.converters or exact in self.prefixes:
+                    children.append(exact)
+                if exact in self.declared:
+                    continue
+            wildcard = path + (WILDCARD,)
+            if wildcard not in children and (
+                wildcard in self.converters or wildcard in self.prefixes
+            ):
+                children.append(wildcard)
+        return children
+
+    def apply(self, data):
+        """Coerces data in place and returns it (or the converted root value)."""
+        root_converter = self.converters.get(())
+        if root_converter is not None:
+            data = root_converter(data)
+
+        stack = [(((),), data)]
+        while stack:
+            paths, node = stack.pop()
+            if isinstance(node, dict):
+                entries = node.items()
+            elif isinstance(node, list):
+                entries = enumerate(node)
+            else:
+                continue
+
+            updates = []
+            for key, value in entries:
+                child_paths = self._child_paths(paths, key, isinstance(node, list))
+                if not child_paths:
+                    continue
+                original = value
+                for child_path in child_paths:
+                    converter = self.converters.get(child_path)
+                    if converter is not None:
+                        value = converter(value)
+                if value is not original:
+                    updates.append((key, value))
+                nested = tuple(path for path in child_paths if path in self.prefixes)
+                if nested:
+                    stack.append((nested, value))
+            for key, value in updates:
+                node[key] = value
+        return data
+
+
+def _resolve_ref(ref, root):
+    if not ref.startswith("#"):
+        raise ValueError(f"Only local schema references are supported: '{ref}'")
+    node = root
+    for part in ref.lstrip("#").strip("/").split("/"):
+        if part:
+            node = node[part.replace("~1", "/").replace("~0", "~")]
+    return node
+
+
+def compile_schema(schema):
+    """Compiles a JSON schema dict into a CoercionPlan."""
+    converters = {}
+    declared = set()
+    stack = [((), schema, frozenset())]
+    while stack:
+        path, node, refs = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        ref = node.get("$ref")
+        if ref is not None:
+            if ref in refs:
+                continue  # Recursive schema; stop at the first repetition
+            stack.append((path, _resolve_ref(ref, schema), refs | {ref}))
+            continue
+
+        converter = _make_converter(node.get("type"))
+        if converter is not None:
+            converters[path] = converter
+
+        for name, subschema in node.get("properties", {}).items():
+            declared.add(path + (name,))
+            stack.append((path + (name,), subschema, refs))
+        for key in ("items", "additionalProperties"):
+            if isinstance(node.get(key), dict):
+                stack.append((path + (WILDCARD,), node[key], refs))
+        for subschema in node.get("allOf", []):
+            stack.append((path, subschema, refs))
+    return CoercionPlan(converters, declared)
+
+
+def compile_type_map(type_map, separator="."):
+    """Compiles an explicit type map into a CoercionPlan.
+
+    Keys are paths joined with separator ('*' matches any key or list item),
+    values are JSON schema type names, e.g. {"database.port": "integer"}.
+    Plans are cached, so the same map is only compiled once.
+    """
+    # Type lists are stored as tuples so that the key is hashable
+    entries = (
+        (path, types if isinstance(types, str) else tuple(types))
+        for path, types in type_map.items()
+    )
+    cache_key = ("map", separator, tuple(sorted(entries, key=str)))
+    plan = _PLAN_CACHE.get(cache_key)
+    if plan is None:
+        converters = {}
+        for dotted_path, types in type_map.items():
+            path = tuple(dotted_path.split(separator)) if dotted_path else ()
+            converter = _make_converter(types)
+            if converter is None:
+                raise ValueError(
+                    f"Unsupported coercion type {types!r} for '{dotted_path}'"
+                )
+            converters[path] = converter
+        plan = _PLAN_CACHE[cache_key] = CoercionPlan(converters)
+    return plan
+
+
+def load_coercion_plan(schema_path):
+    """Loads and compiles a JSON schema file, reusing cached plans.
+
+    The cache is keyed on the file's path and modification time, so converting
+    many files against the same schema only compiles it once.
+    """
+    real_path = os.path.realpath(schema_path)
+    try:
+        cache_key = ("schema", real_path, os.path.getmtime(real_path))
+        plan = _PLAN_CACHE.get(cache_key)
+        if plan is None:
+            with open(real_path, "r", encoding="utf-8") as f:
+                schema = json.load(f)
+            plan = _PLAN_CACHE[cache_key] = compile_schema(schema)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Error loading coercion schema '{schema_path}': {e}")
+    return plan
@@ -1,26 +1,103 @@
 import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # import yaml # Keep it commented or remove if fully replaced by ruamel
 import tomlkit  # Use tomlkit instead of toml
-from dotenv import dotenv_values, set_key
-import os
+from dotenv import dotenv_values
 import configparser  # Import configparser
 import xmltodict  # Import xmltodict
 from ruamel.yaml import YAML  # Import ruamel
 from ruamel.yaml.comments import CommentedMap, CommentedSeq  # Import specific types
-from jsonschema import validate  # Import validate function
-from jsonschema.exceptions import ValidationError
+from jsonschema.exceptions import best_match
 from tomlkit.items import Table, Array
+from .coercion import CoercionPlan, compile_type_map, load_coercion_plan
+from .flatten import DEFAULT_SEPARATORS, flatten, unflatten
+from .interning import InterningConstructor, shared_intern_table
+from .interpolation import interpolate_config
+from .limits import (
+    LimitedComposer,
+    LimitedExpat,
+    check_input_size,
+    check_text,
+    check_tree,
+)
+from .planner import plan_conversion
+from .validation import (
+    DEFAULT_MAX_ERRORS,
+    SchemaValidationError,
+    collect_errors,
+    error_record,
+    load_validator,
+)
 
 # We will add dotenv later if needed
 
 
-def load_config(file_path, format):
-    """Loads configuration from a file based on the format."""
+def load_config(
+    file_path,
+    format,
+    streaming=False,
+    coercion=None,
+    separator=None,
+    prefix=None,
+    intern_table=None,
+    limits=None,
+    expand_env=True,
+):
+    """Loads configuration from a file based on the format.
+
+    With streaming=True, parsers that support it consume the file handle
+    incrementally instead of reading the whole file into memory first.
+    For .env and INI input, keys are unflattened into nested data when a
+    separator is given. With a prefix, only .env keys starting with prefix and
+    the separator ('__' by default) are kept, and the prefix is stripped.
+    If a CoercionPlan is given, string values are converted to the types it
+    describes right after parsing. With an InternTable, JSON, XML and YAML
+    keys and short string values are deduplicated while parsing.
+    With ParseLimits, the input size, nesting depth, number of values and
+    YAML aliases are checked before or during parsing (XML DTDs are
+    rejected), raising LimitExceededError as soon as a limit is hit.
+    With expand_env=False, ${...} references in .env values are kept as
+    written, e.g. for interpolate_config to resolve.
+    """
+    if limits is not None:
+        check_input_size(file_path, limits)
+    data = _parse_config(file_path, format, streaming, intern_table, limits, expand_env)
+    if format == "env" and prefix and separator is None:
+        # Keep the keys flat, but filter and strip the prefix as save_config
+        # writes it (with the default separator)
+        lead = f"{prefix}{DEFAULT_SEPARATORS['env']}"
+        data = {
+            key[len(lead) :]: value
+            for key, value in data.items()
+            if key.startswith(lead)
+        }
+    if separator is not None:
+        if format == "env":
+            data = unflatten(data, separator, prefix=prefix)
+        elif format == "ini":
+            data = {
+                section: unflatten(options, separator)
+                for section, options in data.items()
+            }
+    if limits is not None and format in ("env", "ini"):
+        check_tree(data, limits)
+    if coercion is not None:
+        data = coercion.apply(data)
+    return data
+
+
+def _parse_config(
+    file_path, format, streaming, intern_table=None, limits=None, expand_env=True
+):
+    """Parses a file into Python data; the format-specific part of load_config."""
     if format == "env":
         # dotenv_values reads the file and returns a dict
         # It automatically handles comments and empty lines
-        return dotenv_values(file_path)
+        return dotenv_values(file_path, interpolate=expand_env)
     elif format == "ini":
         config = configparser.ConfigParser()
         config.read(file_path)
@@ -38,85 +115,101 @@ def load_config(file_path, format):
             data["DEFAULT"] = dict(default_section)
         return data
     elif format == "xml":
+        xml_options = {}
+        if intern_table is not None:
+            xml_options["postprocessor"] = intern_table.xml_postprocessor
+        if limits is not None:
+            xml_options["expat"] = LimitedExpat(limits)
+        if streaming:
+            # expat reads the binary handle in chunks; no full copy of the text
+            with open(file_path, "rb") as f:
+                return xmltodict.parse(f, **xml_options)
         with open(file_path, "r", encoding="utf-8") as f:
             # process_namespaces=True can be useful for complex XML
-            return xmltodict.parse(f.read())
+            return xmltodict.parse(f.read(), **xml_options)
     elif format == "yaml":  # Add yaml handling here
-        yaml_loader = YAML(typ="rt")  # typ='rt' (round-trip) preserves comments/styling
+        yaml_loader = _yaml_loader(intern_table, limits)
         with open(file_path, "r", encoding="utf-8") as f:
             return yaml_loader.load(f)
     elif format == "toml":  # Use tomlkit for loading
         with open(file_path, "r", encoding="utf-8") as f:
+            if limits is not None:
+                text = f.read()
+                check_text(text, "toml", limits)
+                document = tomlkit.parse(text)
+                # [a.b.c] headers and dotted keys nest without brackets
+                check_tree(document, limits)
+                return document
             return tomlkit.load(f)
     with open(file_path, "r", encoding="utf-8") as f:
         if format == "json":
-            return json.load(f)
+            hook = intern_table.json_pairs_hook if intern_table is not None else None
+            if limits is not None:
+                text = f.read()
+                check_text(text, "json", limits)
+                return json.loads(text, object_pairs_hook=hook)
+            return json.load(f, object_pairs_hook=hook)
         # elif format == "yaml": # Remove old yaml handling
         #     return yaml.safe_load(f)
         else:
             raise ValueError(f"Unsupported source format: {format}")
 
 
-def save_config(data, file_path, format):
-    """Saves configuration data to a file based on the format."""
+def _yaml_loader(intern_table=None, limits=None):
+    """Returns a round-trip YAML loader, interning strings if a table is given
+    and enforcing ParseLimits if given.
+    """
+    yaml_loader = YAML(typ="rt")  # typ='rt' (round-trip) preserves comments/styling
+    if intern_table is not None:
+        yaml_loader.Constructor = InterningConstructor
+        yaml_loader.intern_table = intern_table
+    if limits is not None:
+        yaml_loader.Composer = LimitedComposer
+        yaml_loader.parse_limits = limits
+    return yaml_loader
+
+
+def save_config(data, file_path, format, streaming=False, separator=None, prefix=None):
+    """Saves configuration data to a file based on the format.
+
+    With streaming=True, writers that support it write straight into the
+    output file instead of building the whole document as a string.
+    For .env and INI output, nested values are flattened with separator
+    (default '__' for .env and '.' for INI); prefix is prepended to .env keys.
+    """
     if format == "env":
-        # Ensure the output file exists or create it for set_key
-        # Create the file if it doesn't exist, otherwise do nothing
-        if not os.path.exists(file_path):
-            open(file_path, "w").close()
-        elif (
-            os.path.getsize(file_path) > 0
-        ):  # Clear the file if it exists and is not empty
-            open(file_path, "w").close()
-
-        # Write key-value pairs, converting basic types to string
-        # Note: This flattens the structure and only saves top-level keys.
-        # Complex structures (dicts, lists) are ignored for .env.
-        # set_key modifies the file directly.
-        temp_env_vars = {}
-        for key, value in data.items():
-            if isinstance(value, (str, int, float, bool)):
-                # Convert bool to lower case string as per common .env practice
-                str_value = (
-                    str(value).lower() if isinstance(value, bool) else str(value)
-                )
-                set_key(
-                    file_path, key, str_value, quote_mode="never"
-                )  # Avoid unnecessary quotes
-                temp_env_vars[key] = str_value  # Keep track of what was written
-            elif isinstance(value, dict):
-                print(
-                    f"Warning: Skipping nested dictionary for key '{key}' "
-                    f"when saving to .env"
-                )
-            elif isinstance(value, list):
-                print(f"Warning: Skipping list for key '{key}' when saving to .env")
-            # Optionally, log a warning for other skipped complex types
-            # else:
-            #     print(
-            #          f"Warning: Skipping complex value type {type(value)} "
-            #          f"for key '{key}' when saving to .env"
-            #     )
-
-        # Verify what's actually in the file after modifications (optional but good practice)
-        # final_env_values = dotenv_values(file_path)
-        # print(f"Final .env content for {file_path}: {final_env_values}") # Debugging line
-        return  # set_key handles file writing
+        # Nested dicts and lists are flattened into KEY__CHILD / KEY__0 keys
+        flat_data = flatten(data, separator or DEFAULT_SEPARATORS["env"], prefix=prefix)
+        with open(file_path, "w", encoding="utf-8") as f:
+            for key, value in flat_data.items():
+                if value is None:
+                    # A bare key is read back as None by dotenv_values
+                    f.write(f"{key}\n")
+                else:
+                    # Unquoted KEY=value lines, as set_key(quote_mode="never")
+                    f.write(f"{key}={_format_flat_value(value)}\n")
+        return
     elif format == "ini":
         config = configparser.ConfigParser()
         # Iterate through the dictionary which should represent sections
         for section_name, section_data in data.items():
             if isinstance(section_data, dict):
-                config[section_name] = {}
-                for key, value in section_data.items():
-                    # Ensure values are strings for configparser
-                    config[section_name][key] = str(value)
+                # Nested values are flattened into keys such as 'pool.size'
+                flat_section = flatten(
+                    section_data, separator or DEFAULT_SEPARATORS["ini"]
+                )
+                # Ensure values are strings for configparser
+                config[section_name] = {
+                    key: str(value) for key, value in flat_section.items()
+                }
             else:
                 # Handle top-level keys - perhaps put them in a default section?
                 # Or raise an error/warning as INI requires sections.
                 # For now, let's put non-dict items in DEFAULT section if the key is 'DEFAULT'
                 # or skip otherwise with a warning.
-                if section_name == "DEFAULT" and not isinstance(value, (dict, list)):
+                if section_name == "DEFAULT" and not isinstance(
+                    section_data, (dict, list)
+                ):
                     # configparser handles DEFAULT section specially via defaults()
                     # It might be better to handle default section assignment explicitly if needed.
                     # Let's try adding non-dict/list items directly to the config object
@@ -149,7 +242,10 @@ def save_config(data, file_path, format):
         with open(file_path, "w", encoding="utf-8") as f:
             # pretty=True for readable output
             # indent='  ' for standard indentation
-            f.write(xmltodict.unparse(xml_data, pretty=True, indent="  "))
+            if streaming:
+                xmltodict.unparse(xml_data, output=f, pretty=True, indent="  ")
+            else:
+                f.write(xmltodict.unparse(xml_data, pretty=True, indent="  "))
         return
     elif format == "yaml":  # Add yaml handling here
         yaml_dumper = YAML(typ="rt")
@@ -175,16 +271,21 @@ def save_config(data, file_path, format):
             raise ValueError(f"Unsupported target format: {format}")
 
 
-def validate_data(data, schema_path):
-    """Validates data against a JSON schema file."""
+def validate_data(
+    data, schema_path, collect_all=False, max_errors=DEFAULT_MAX_ERRORS, workers=None
+):
+    """Validates data against a JSON schema file.
+
+    By default only the most relevant error is reported. With collect_all=True,
+    up to max_errors errors are collected (in parallel for large top-level
+    arrays and mappings when workers > 1). Either way, failures raise a
+    SchemaValidationError whose `errors` attribute is the structured report.
+    """
     if not schema_path:
         return  # No schema provided, skip validation
 
-    try:
-        with open(schema_path, "r", encoding="utf-8") as f:
-            schema = json.load(f)
-    except Exception as e:
-        raise ValueError(f"Error loading schema file '{schema_path}': {e}")
+    # Compiled once per schema file and reused across calls
+    validator = load_validator(schema_path)
 
     try:
         # Convert ruamel types to standard Python dict/list for validation
@@ -194,14 +295,37 @@ def validate_data(data, schema_path):
         else:
             data_for_validation = data
 
-        validate(instance=data_for_validation, schema=schema)
-        print(f"Data validated successfully against schema '{schema_path}'.")
-    except ValidationError as e:
-        raise ValueError(f"Schema validation failed: {e.message}")
+        if collect_all:
+            errors = collect_errors(
+                data_for_validation, schema_path, max_errors, workers
+            )
+        else:
+            error = best_match(validator.iter_errors(data_for_validation))
+            errors = [] if error is None else [error_record(error)]
     except Exception as e:
         # Catch other potential errors during validation
         raise ValueError(f"An error occurred during schema validation: {e}")
 
+    if errors:
+        if collect_all:
+            message = (
+                f"Schema validation failed with {len(errors)} error(s):"
+                + "".join(
+                    f"\n  {error['path'] or '/'}: {error['message']}"
+                    for error in errors
+                )
+            )
+        else:
+            message = f"Schema validation failed: {errors[0]['message']}"
+        raise SchemaValidationError(message, errors)
+    print(f"Data validated successfully against schema '{schema_path}'.")
+
+
+def _format_flat_value(value):
+    """Formats a leaf value for .env output."""
+    # Lower case booleans as per common .env practice
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
 
 # Helper function to recursively convert ruamel types
 def _convert_ruamel_to_standard(item):
@@ -237,6 +361,400 @@ def _convert_tomlkit_to_standard(item):
         return item
 
 
+def load_yaml_documents(file_path, intern_table=None, limits=None):
+    """Yields the documents of a (possibly multi-document) YAML file one by one.
+
+    Only the document being parsed is kept in memory; empty documents
+    (e.g. after a trailing '---') are skipped. ParseLimits apply per document,
+    except for max_input_bytes, which applies to the whole file.
+    """
+    if limits is not None:
+        check_input_size(file_path, limits)
+    yaml_loader = _yaml_loader(intern_table, limits)
+    with open(file_path, "r", encoding="utf-8") as f:
+        for document in yaml_loader.load_all(f):
+            if document is not None:
+                yield document
+
+
+def _document_path(output_file, index):
+    """Returns the output path of document `index`, e.g. out.json -> out-3.json."""
+    root, ext = os.path.splitext(str(output_file))
+    return f"{root}-{index}{ext}"
+
+
+def _convert_yaml_documents(
+    input_file,
+    target_format,
+    output_file,
+    input_schema=None,
+    output_schema=None,
+    coercion=None,
+    separator=None,
+    env_prefix=None,
+    per_document_files=False,
+    workers=None,
+    interpolation_variables=None,
+    all_errors=False,
+    max_errors=DEFAULT_MAX_ERRORS,
+    intern_table=None,
+    limits=None,
+):
+    """Converts each document of a YAML stream; returns the document count.
+
+    Documents are interpolated when interpolation_variables is not None.
+    """
+    ndjson = target_format == "json" and not per_document_files
+
+    def convert_document(index, document):
+        if interpolation_variables is not None:
+            document = interpolate_config(
+                document, interpolation_variables, limits=limits
+            )
+        if coercion is not None:
+            document = coercion.apply(document)
+        if input_schema:
+            validate_data(document, input_schema, all_errors, max_errors)
+        if output_schema:
+            validate_data(document, output_schema, all_errors, max_errors)
+        if ndjson:
+            return json.dumps(document, ensure_ascii=False) + "\n"
+        save_config(
+            document,
+            _document_path(output_file, index),
+            target_format,
+            separator=separator,
+            prefix=env_prefix,
+        )
+
+    workers = max(1, workers or 1)
+    # Bound the number of documents in flight so memory stays proportional
+    # to a few documents rather than the whole stream.
+    max_pending = workers * 2
+    pending = deque()
+    count = 0
+    out = open(output_file, "w", encoding="utf-8") if ndjson else None
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for index, document in enumerate(
+                load_yaml_documents(input_file, intern_table, limits)
+            ):
+                pending.append(executor.submit(convert_document, index, document))
+                while len(pending) >= max_pending:
+                    result = pending.popleft().result()
+                    if out is not None:
+                        out.write(result)
+                count += 1
+            while pending:
+                result = pending.popleft().result()
+                if out is not None:
+                    out.write(result)
+    finally:
+        if out is not None:
+            out.close()
+    return count
+
+
+# File extensions of each format, the first one is used for new files
+FORMAT_EXTENSIONS = {
+    "json": (".json",),
+    "yaml": (".yaml", ".yml"),
+    "toml": (".toml",),
+    "env": (".env",),
+    "ini": (".ini",),
+    "xml": (".xml",),
+}
+
+# Formats whose documents must be a mapping at the top level
+_MAPPING_ONLY_FORMATS = {"toml", "env", "ini"}
+
+# Number of bytes read by detect_format() when the extension is not enough
+SNIFF_BYTES = 4096
+
+_BOMS = (
+    (b"\xef\xbb\xbf", "utf-8"),
+    (b"\xff\xfe", "utf-16-le"),
+    (b"\xfe\xff", "utf-16-be"),
+)
+_SECTION_LINE = re.compile(r"^\[\[?[^\[\]=]+\]\]?$")
+# '[' followed by a JSON value; '[[' is left to the TOML table check
+_JSON_ARRAY_START = re.compile(r"^\[\s*([\"{\]\d-]|true\b|false\b|null\b|$)")
+_KEY_VALUE_LINE = re.compile(r"^(export\s+)?([\w.\-\"']+)(\s*[=:]\s*)(.*)$")
+# Values that are valid TOML literals (strings, numbers, booleans, arrays,
+# inline tables and dates); anything else is a bare INI/.env value.
+_TOML_VALUE = re.compile(
+    r"""^("[^"]*"|'[^']*'|\[.*|\{.*|[+-]?\d[\d_]*(\.\d+)?([eE][+-]?\d+)?|"""
+    r"""true|false|[+-]?(inf|nan)|\d{4}-\d{2}-\d{2}[T \d:.+\-Z]*)\s*(#.*)?$"""
+)
+
+
+def _sniff_format(text, truncated=False):
+    """Guesses the format of a configuration text from its first lines."""
+    stripped = text.lstrip()
+    if not stripped:
+        return None
+    if stripped.startswith("<"):
+        return "xml"
+    if stripped.startswith("{"):
+        return "json"
+
+    lines = stripped.splitlines()
+    if truncated and len(lines) > 1:
+        lines = lines[:-1]  # The last line may have been cut by the sniff limit
+    lines = [line.strip() for line in lines if line.strip()]
+    # A top-level array, unless the line is a table header such as
+    # ["quoted key"] followed by more lines
+    if _SECTION_LINE.match(lines[0]):
+        if len(lines) == 1 and _JSON_ARRAY_START.match(lines[0]):
+            return "json"
+    elif lines[0].startswith("["):
+        return "json"
+    if lines[0].startswith(("---", "%YAML")):
+        return "yaml"
+
+    has_section = False
+    ini_markers = False  # ';' comments, 'key: value' or bare values
+    spaced_pairs = False
+    plain_pairs = False
+    for line in lines:
+        if line.startswith("#"):
+            continue
+        if line.startswith(";"):
+            ini_markers = True
+            continue
+        if _SECTION_LINE.match(line):
+            if line.startswith("[["):
+                return "toml"  # Array of tables
+            has_section = True
+            continue
+        if line.startswith("- "):
+            return "yaml"
+        match = _KEY_VALUE_LINE.match(line)
+        if match is None:
+            continue
+        exported, _, delimiter, value = match.groups()
+        if ":" in delimiter:
+            if not has_section:
+                return "yaml"
+            ini_markers = True
+        elif exported:
+            return "env"
+        elif not _TOML_VALUE.match(value):
+            ini_markers = True
+        elif delimiter == "=":
+            plain_pairs = True
+        else:
+            spaced_pairs = True
+
+    if has_section:
+        return "ini" if ini_markers else "toml"
+    if ini_markers or plain_pairs:
+        return "env"
+    if spaced_pairs:
+        return "toml"
+    return None
+
+
+def detect_format(file_path, sniff_bytes=SNIFF_BYTES):
+    """Detects the format of a configuration file.
+
+    The file extension is used when it is known (.json, .yml/.yaml, .toml,
+    .ini/.cfg, .env/.env.*, .xml). Otherwise only the first sniff_bytes are
+    read and matched line by line against cheap markers (BOM, '<?xml',
+    '{'/'[', '[section]', 'KEY=value', 'key: value', '---'); nothing is
+    parsed.
+    Raises ValueError if the format cannot be determined.
+    """
+    name = os.path.basename(str(file_path)).lower()
+    extension = os.path.splitext(name)[1]
+    for format, extensions in FORMAT_EXTENSIONS.items():
+        if extension in extensions:
+            return format
+    if extension == ".cfg":
+        return "ini"
+    if name == ".env" or name.startswith(".env."):
+        return "env"
+
+    with open(file_path, "rb") as f:
+        head = f.read(sniff_bytes)
+    truncated = len(head) == sniff_bytes
+    encoding = "utf-8"
+    for bom, bom_encoding in _BOMS:
+        if head.startswith(bom):
+            head, encoding = head[len(bom) :], bom_encoding
+            break
+    format = _sniff_format(head.decode(encoding, errors="ignore"), truncated)
+    if format is None:
+        raise ValueError(f"Could not detect the format of '{file_path}'.")
+    return format
+
+
+def _split_path(path):
+    """Splits a dotted --split-by path; None, '' and '.' mean the top level."""
+    if path in (None, "", "."):
+        return []
+    return path.split(".")
+
+
+def _shard_name(key):
+    """Returns a file-system safe shard name for a section key."""
+    name = re.sub(r'[\\/:*?"<>|]', "_", str(key))
+    return name if name not in ("", ".", "..") else f"_{name}"
+
+
+def split_config(
+    data,
+    output_dir,
+    target_format,
+    split_by=None,
+    workers=None,
+    separator=None,
+    prefix=None,
+):
+    """Writes each section of data as a separate file in output_dir.
+
+    split_by is a dotted path selecting the mapping (or list) to split;
+    by default every top-level section becomes a shard named after its key.
+    Shards are serialized concurrently by `workers` threads.
+    Returns the list of written paths.
+    """
+    node = data
+    for part in _split_path(split_by):
+        if isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+        elif isinstance(node, dict) and part in node:
+            node = node[part]
+        else:
+            raise ValueError(f"Split path '{split_by}' not found in the input.")
+    if isinstance(node, dict):
+        sections = list(node.items())
+    elif isinstance(node, list):
+        sections = list(enumerate(node))
+    else:
+        raise ValueError(f"Split path '{split_by}' is not a mapping or list.")
+
+    for key, section in sections:
+        if target_format in _MAPPING_ONLY_FORMATS and not isinstance(section, dict):
+            raise ValueError(
+                f"Section '{key}' is not a mapping and cannot be written "
+                f"as {target_format}."
+            )
+
+    extension = FORMAT_EXTENSIONS[target_format][0]
+    paths = [
+        os.path.join(output_dir, _shard_name(key) + extension) for key, _ in sections
+    ]
+    # Keys such as 'a/b' and 'a_b' share a file name (case-insensitively on
+    # some file systems); writing both would silently lose a section
+    seen = {}
+    for (key, _), path in zip(sections, paths):
+        other = seen.setdefault(os.path.normcase(path).lower(), key)
+        if other != key:
+            raise ValueError(
+                f"Sections '{other}' and '{key}' would both be written to "
+                f"'{os.path.basename(path)}'."
+            )
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    def write_shard(index):
+        save_config(
+            sections[index][1],
+            paths[index],
+            target_format,
+            separator=separator,
+            prefix=prefix,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or 1)) as executor:
+        # list() re-raises the first error from any shard
+        list(executor.map(write_shard, range(len(sections))))
+    return paths
+
+
+def join_config(
+    input_dir,
+    source_format,
+    join_at=None,
+    workers=None,
+    coercion=None,
+    separator=None,
+    prefix=None,
+    intern_table=None,
+    limits=None,
+    expand_env=True,
+):
+    """Assembles a directory of shards (see split_config) into one document.
+
+    Every file with an extension of source_format becomes a section named
+    after the file; shards named 0..n-1 are joined into a list. With join_at,
+    the sections are nested under that dotted path. Shards are loaded
+    concurrently by `workers` threads.
+    """
+    extensions = FORMAT_EXTENSIONS.get(source_format)
+    if extensions is None:
+        raise ValueError(f"Unsupported source format: {source_format}")
+    names = sorted(
+        name
+        for name in os.listdir(input_dir)
+        if name.endswith(extensions) and os.path.isfile(os.path.join(input_dir, name))
+    )
+    if not names:
+        raise ValueError(f"No {source_format} shards found in '{input_dir}'.")
+
+    def read_shard(name):
+        return load_config(
+            os.path.join(input_dir, name),
+            source_format,
+            coercion=coercion,
+            separator=separator,
+            prefix=prefix,
+            intern_table=intern_table,
+            limits=limits,
+            expand_env=expand_env,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or 1)) as executor:
+        shards = list(executor.map(read_shard, names))
+
+    keys = [os.path.splitext(name)[0] for name in names]
+    if all(key.isdigit() for key in keys) and sorted(map(int, keys)) == list(
+        range(len(keys))
+    ):
+        order = sorted(range(len(keys)), key=lambda i: int(keys[i]))
+        data = [shards[i] for i in order]
+    else:
+        data = dict(zip(keys, shards))
+    for part in reversed(_split_path(join_at)):
+        data = {part: data}
+    return data
+
+
+def _load_variables(env_files):
+    """Merges the values of .env files; later files take precedence."""
+    variables = {}
+    for env_file in env_files or ():
+        variables.update(dotenv_values(env_file))
+    return variables
+
+
+def _build_coercion(coerce_schema, type_map):
+    """Compiles (or reuses) the CoercionPlan for a schema and/or type map."""
+    if coerce_schema and type_map:
+        # Explicit type map entries take precedence over the schema
+        return CoercionPlan(
+            {
+                **load_coercion_plan(coerce_schema).converters,
+                **compile_type_map(type_map).converters,
+            }
+        )
+    if coerce_schema:
+        return load_coercion_plan(coerce_schema)
+    if type_map:
+        return compile_type_map(type_map)
+    return None
+
+
 def convert(
     input_file,
     source_format,
@@ -244,30 +762,212 @@ def convert(
     output_file,
     input_schema=None,
     output_schema=None,
+    max_memory=None,
+    verbose=False,
+    coerce_schema=None,
+    type_map=None,
+    separator=None,
+    env_prefix=None,
+    multi_document=False,
+    per_document_files=False,
+    workers=None,
+    interpolate=False,
+    env_files=None,
+    all_errors=False,
+    max_errors=DEFAULT_MAX_ERRORS,
+    split_by=None,
+    join=False,
+    intern_strings=False,
+    limits=None,
 ):
     """Converts a configuration file from source_format to target_format,
-    optionally validating against JSON schemas.
+    optionally validating against JSON schemas. source_format may be 'auto'
+    to use detect_format().
+
+    An execution plan is made before loading: large inputs are converted
+    through the streaming path, and inputs whose estimated peak memory exceeds
+    max_memory (in bytes) are refused with a ValueError.
+
+    String values from .env, INI and XML sources can be converted to their
+    real types with coerce_schema (a JSON schema file) and/or type_map
+    (e.g. {"database.port": "integer"}); both are compiled once and cached.
+
+    Nested data is flattened when writing .env/INI output; with separator,
+    flat .env/INI input is unflattened as well. env_prefix prepends (output)
+    or filters and strips (input) a prefix on .env keys.
+
+    With multi_document=True, a '---'-separated YAML stream is converted one
+    document at a time: to one NDJSON record per document for JSON output
+    (unless per_document_files is set), otherwise to one numbered file per
+    document. Documents are written by a pool of `workers` threads.
+
+    With interpolate=True, ${VAR} and ${section.key} references are resolved
+    after loading, from the data itself, the given .env files (env_files)
+    and the environment, before any type coercion.
+
+    With all_errors=True, schema validation reports up to max_errors errors
+    instead of the first one; large top-level arrays/mappings are then
+    validated by `workers` processes.
+
+    With split_by (a dotted path, or '.' for the top level), output_file is a
+    directory and each section under that path is written to its own file.
+    With join=True, input_file is a directory of such shards, which are
+    assembled into one document (nested under split_by, if given).
+
+    With intern_strings=True, repeated keys and short string values of JSON,
+    XML and YAML input share one object through a bounded, process-wide
+    intern table, which reduces memory for large or many similar files.
+
+    limits (a ParseLimits, e.g. UNTRUSTED_LIMITS) hardens parsing of
+    untrusted inputs; every loaded file fails fast with LimitExceededError
+    when it exceeds a limit, and so does interpolation when it renders more
+    text than limits.max_interpolated_length.
+
+    Returns the source format, which is the detected one for 'auto'.
     """
     # Normalize formats to lower case
     source_format = source_format.lower()
     target_format = target_format.lower()
 
-    if source_format == target_format:
+    if source_format == "auto":
+        if join:
+            raise ValueError("The source format must be given when joining shards.")
+        source_format = detect_format(input_file)
+        if verbose:
+            print(f"Detected source format '{source_format}' for '{input_file}'.")
+
+    # Sharding a file into the same format is a valid use of split/join
+    if source_format == target_format and split_by is None and not join:
         raise ValueError("Source and target formats cannot be the same.")
+    if join != os.path.isdir(input_file):
+        raise ValueError(
+            f"'{input_file}' must be a directory of shards when joining"
+            if join
+            else f"'{input_file}' is a directory; use join to assemble shards"
+        )
 
-    # Load data from the source file
-    data = load_config(input_file, source_format)
+    intern_table = shared_intern_table() if intern_strings else None
+
+    # The planner estimates a single input file; documents and shards are
+    # loaded one by one instead, so there is no plan to check a budget against
+    if multi_document or join:
+        source = "multi-document input" if multi_document else "joined shards"
+        if max_memory is not None:
+            raise ValueError(f"max_memory is not supported for {source}.")
+        if verbose:
+            print(f"Execution plan: none for {source}; files are loaded in memory.")
+
+    if multi_document:
+        if source_format != "yaml":
+            raise ValueError("Multi-document input is only supported for YAML.")
+        if split_by is not None or join:
+            raise ValueError(
+                "Multi-document input cannot be combined with split or join."
+            )
+        count = _convert_yaml_documents(
+            input_file,
+            target_format,
+            output_file,
+            input_schema=input_schema,
+            output_schema=output_schema,
+            coercion=_build_coercion(coerce_schema, type_map),
+            separator=separator,
+            env_prefix=env_prefix,
+            per_document_files=per_document_files,
+            workers=workers,
+            interpolation_variables=(
+                _load_variables(env_files) if interpolate else None
+            ),
+            all_errors=all_errors,
+            max_errors=max_errors,
+            intern_table=intern_table,
+            limits=limits,
+        )
+        if verbose:
+            print(f"Converted {count} YAML documents from '{input_file}'.")
+        return source_format
+
+    # Compile (or reuse) the type coercion plan. References are resolved
+    # before type coercion, so that e.g. "${PORT}" can still become an integer.
+    coercion = _build_coercion(coerce_schema, type_map)
+    load_coercion = None if interpolate else coercion
+
+    if join:
+        data = join_config(
+            input_file,
+            source_format,
+            join_at=split_by,
+            workers=workers,
+            coercion=load_coercion,
+            separator=separator,
+            prefix=env_prefix,
+            intern_table=intern_table,
+            limits=limits,
+            expand_env=not interpolate,
+        )
+        streaming = False
+    else:
+        # Decide how to run the conversion before anything is parsed
+        plan = plan_conversion(
+            input_file,
+            source_format,
+            target_format,
+            max_memory=max_memory,
+            validate=bool(input_schema or output_schema),
+        )
+        if verbose:
+            print(plan.describe())
+        streaming = plan.streaming
+
+        # Load data from the source file
+        data = load_config(
+            input_file,
+            source_format,
+            streaming=streaming,
+            coercion=load_coercion,
+            separator=separator,
+            prefix=env_prefix,
+            intern_table=intern_table,
+            limits=limits,
+            expand_env=not interpolate,
+        )
+    if interpolate:
+        data = interpolate_config(data, _load_variables(env_files), limits=limits)
+        if coercion is not None:
+            data = coercion.apply(data)
 
     # Validate input data if schema provided
     if input_schema:
         print(f"Validating input data from '{input_file}'...")
-        validate_data(data, input_schema)
+        validate_data(data, input_schema, all_errors, max_errors, workers)
 
     # Validate output data if schema provided
     # Note: Validation happens *before* saving, using the in-memory data.
     if output_schema:
         print(f"Validating output data for '{output_file}'...")
-        validate_data(data, output_schema)
+        validate_data(data, output_schema, all_errors, max_errors, workers)
+
+    if split_by is not None and not join:
+        paths = split_config(
+            data,
+            output_file,
+            target_format,
+            split_by=split_by,
+            workers=workers,
+            separator=separator,
+            prefix=env_prefix,
+        )
+        if verbose:
+            print(f"Wrote {len(paths)} shards to '{output_file}'.")
+        return source_format
 
     # Save data to the target file
-    save_config(data, output_file, target_format)
+    save_config(
+        data,
+        output_file,
+        target_format,
+        streaming=streaming,
+        separator=separator,
+        prefix=env_prefix,
+    )
+    return source_format
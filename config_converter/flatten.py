@@ -0,0 +1,93 @@
+# Flatten/unflatten engine for flat formats (.env and INI).
+# Nested configs are mapped to flat keys such as DATABASE__HOST or db.host,
+# with list items stored under their index (SERVERS__0). Both directions are
+# iterative, so deep trees cannot hit the recursion limit, and run in time
+# linear in the number of leaves.
+
+# Separators used by save_config when none is given
+DEFAULT_SEPARATORS = {"env": "__", "ini": "."}
+
+
+def flatten(data, separator="__", prefix=None):
+    """Flattens nested dicts/lists into a single-level dict.
+
+    Keys are joined with separator and list items use their index. If prefix
+    is given it is prepended to every key (e.g. prefix='APP' -> 'APP__HOST').
+    Empty dicts and lists have no flat representation; they are skipped
+    with a warning. Raises ValueError if two different paths produce the
+    same flat key.
+    """
+    flat = {}
+    stack = [(prefix, data)]
+    while stack:
+        key, node = stack.pop()
+        if isinstance(node, dict):
+            children = node.items()
+        elif isinstance(node, list):
+            children = enumerate(node)
+        else:
+            children = None
+        if children is not None and not node and key is not None:
+            # An empty container has no leaves, so no flat key can hold it
+            kind = "dictionary" if isinstance(node, dict) else "list"
+            print(f"Warning: Skipping empty {kind} for key '{key}' when flattening")
+            continue
+        if children is None:
+            if key is None:
+                raise ValueError("Only dicts and lists can be flattened.")
+            if key in flat:
+                raise ValueError(f"Key collision while flattening: '{key}'")
+            flat[key] = node
+            continue
+        # Push children in reverse so they are emitted in document order
+        stack.extend(
+            reversed(
+                [
+                    (str(k) if key is None else f"{key}{separator}{k}", v)
+                    for k, v in children
+                ]
+            )
+        )
+    return flat
+
+
+def unflatten(flat, separator="__", prefix=None, list_indices=True):
+    """Rebuilds a nested dict from flat keys; the inverse of flatten().
+
+    Only keys starting with prefix + separator are kept when prefix is given,
+    and the prefix is stripped. With list_indices=True, mappings whose keys
+    are exactly '0'..'n-1' become lists. Raises ValueError when a key is used
+    both as a value and as a parent (e.g. 'A=1' and 'A__B=2').
+    """
+    root = {}
+    lead = f"{prefix}{separator}" if prefix else None
+    # (parent, key, node) for every dict created below the root, in creation
+    # order; children are always created after their parents.
+    created = []
+    for flat_key, value in flat.items():
+        if lead is not None:
+            if not flat_key.startswith(lead):
+                continue
+            flat_key = flat_key[len(lead) :]
+        parts = flat_key.split(separator)
+        node = root
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is None:
+                if part in node:
+                    raise ValueError(f"Key collision while unflattening: '{part}'")
+                child = node[part] = {}
+                created.append((node, part, child))
+            elif not isinstance(child, dict):
+                raise ValueError(f"Key collision while unflattening: '{flat_key}'")
+            node = child
+        if parts[-1] in node:
+            raise ValueError(f"Key collision while unflattening: '{flat_key}'")
+        node[parts[-1]] = value
+
+    if list_indices:
+        # Deepest dicts first, so nested lists are converted before parents
+        for parent, key, node in reversed(created):
+            if node and all(str(i) in node for i in range(len(node))):
+                parent[key] = [node[str(i)] for i in range(len(node))]
+    return root
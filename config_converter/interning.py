@@ -0,0 +1,82 @@
+from ruamel.yaml.constructor import RoundTripConstructor
+
+# String interning for loaded configs.
+# Large exports and batch runs over similar files repeat the same keys
+# ("host", "port", "@id", ...) and short values millions of times. Loaders can
+# route their strings through an InternTable so that equal strings share one
+# object. The table is bounded: once full, new strings are passed through
+# unchanged, which keeps its own memory predictable in long-running batches.
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Longer values are rarely repeated and are not worth a table slot
+DEFAULT_MAX_VALUE_LENGTH = 64
+
+
+class InternTable:
+    """A bounded table of canonical string objects."""
+
+    def __init__(
+        self,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        max_value_length=DEFAULT_MAX_VALUE_LENGTH,
+    ):
+        self.max_entries = max_entries
+        self.max_value_length = max_value_length
+        self._strings = {}
+
+    def __len__(self):
+        return len(self._strings)
+
+    def clear(self):
+        self._strings.clear()
+
+    def key(self, text):
+        """Returns the canonical object for a mapping key."""
+        canonical = self._strings.get(text)
+        if canonical is not None:
+            return canonical
+        if len(self._strings) < self.max_entries:
+            self._strings[text] = text
+        return text
+
+    def value(self, value):
+        """Returns the canonical object for a short plain string value."""
+        if type(value) is str and len(value) <= self.max_value_length:
+            return self.key(value)
+        return value
+
+    def json_pairs_hook(self, pairs):
+        """object_pairs_hook for json.load."""
+        return {self.key(key): self.value(value) for key, value in pairs}
+
+    def xml_postprocessor(self, path, key, value):
+        """postprocessor for xmltodict.parse (elements and attributes)."""
+        return self.key(key), self.value(value)
+
+
+class InterningConstructor(RoundTripConstructor):
+    """Round-trip YAML constructor routing plain strings through an InternTable.
+
+    The table is read from the `intern_table` attribute of the YAML instance.
+    """
+
+    def construct_interned_str(self, node):
+        value = self.construct_yaml_str(node)
+        table = getattr(self.loader, "intern_table", None)
+        return value if table is None else table.value(value)
+
+
+# Registered on this subclass only; the stock round-trip loader is unchanged
+InterningConstructor.add_constructor(
+    "tag:yaml.org,2002:str", InterningConstructor.construct_interned_str
+)
+
+# Table shared by every load in the process, so batch runs over many similar
+# files reuse the same key objects
+_shared_table = InternTable()
+
+
+def shared_intern_table():
+    """Returns the process-wide InternTable used by convert()."""
+    return _shared_table
@@ -0,0 +1,205 @@
+import os
+import re
+
+from .limits import LimitExceededError
+
+# Variable interpolation for loaded configs.
+# String values may contain ${VAR} or ${section.key} references. All templated
+# strings are parsed once, linked into a reference graph and resolved in
+# dependency order, so each value is rendered exactly once and cycles are
+# reported instead of looping.
+
+# $${...} is an escaped, literal ${...}
+_REFERENCE = re.compile(r"\$\$\{[^{}]*\}|\$\{([^{}]+)\}")
+
+
+def _parse_template(text):
+    """Splits a string into literal parts and reference names.
+
+    Returns None if the string contains no references or escapes.
+    """
+    segments = []
+    position = 0
+    for match in _REFERENCE.finditer(text):
+        if match.start() > position:
+            segments.append(text[position : match.start()])
+        if match.group(1) is None:
+            segments.append(match.group(0)[1:])  # Drop the escaping '$'
+        else:
+            segments.append((match.group(1).strip(),))
+        position = match.end()
+    if not segments:
+        return None
+    if position < len(text):
+        segments.append(text[position:])
+    return segments
+
+
+def _find_path(data, name):
+    """Returns the path of ${name} inside data, or None if it is not there."""
+    if isinstance(data, dict) and name in data:
+        return (name,)
+    node, path = data, ()
+    for part in name.split("."):
+        if isinstance(node, dict) and part in node:
+            node = node[part]
+            path += (part,)
+        elif isinstance(node, list) and part.isdigit() and int(part) < len(node):
+            node = node[int(part)]
+            path += (int(part),)
+        else:
+            return None
+    return path
+
+
+def _get_path(data, path):
+    for part in path:
+        data = data[part]
+    return data
+
+
+def _format_path(path):
+    return ".".join(str(part) for part in path)
+
+
+def _to_text(value):
+    if isinstance(value, bool):
+        return str(value).lower()
+    return "" if value is None else str(value)
+
+
+def interpolate_config(data, variables=None, use_environ=True, limits=None):
+    """Resolves ${...} references in the string values of data, in place.
+
+    A reference is looked up as a (dotted) path in data first, then in
+    variables (e.g. values from .env files) and finally in os.environ.
+    A string that is a single reference takes the referenced value as is,
+    so "${db.port}" stays an integer. Returns data.
+
+    Raises ValueError on unresolved or circular references, and
+    LimitExceededError when the rendered strings exceed
+    limits.max_interpolated_length characters in total.
+    """
+    variables = variables or {}
+
+    # Collect the templated strings: path -> (parent, key, segments)
+    templates = {}
+    stack = [((), data)]
+    while stack:
+        path, node = stack.pop()
+        if isinstance(node, dict):
+            entries = node.items()
+        elif isinstance(node, list):
+            entries = enumerate(node)
+        else:
+            continue
+        for key, value in entries:
+            if isinstance(value, str):
+                if "$" in value:
+                    segments = _parse_template(value)
+                    if segments is not None:
+                        templates[path + (key,)] = (node, key, segments)
+            elif isinstance(value, (dict, list)):
+                stack.append((path + (key,), value))
+    if not templates:
+        return data
+
+    # Link each template to the templates it references. A referenced mapping
+    # or list becomes a graph node of its own that depends on every template
+    # below it, so each reference adds a single edge.
+    targets = {}
+    dependencies = {}
+    containers = set()
+    for path, (_, _, segments) in templates.items():
+        deps = []
+        for segment in segments:
+            if isinstance(segment, tuple):
+                name = segment[0]
+                if name not in targets:
+                    targets[name] = _find_path(data, name)
+                target = targets[name]
+                if target is None:
+                    continue
+                if target in templates:
+                    deps.append(target)
+                elif isinstance(_get_path(data, target), (dict, list)):
+                    containers.add(target)
+                    deps.append(target)
+        dependencies[path] = deps
+    for container in containers:
+        dependencies[container] = []
+    for path in templates:
+        for depth in range(len(path)):
+            if path[:depth] in containers:
+                dependencies[path[:depth]].append(path)
+
+    def lookup(name, path):
+        target = targets[name]
+        if target is not None:
+            return _get_path(data, target)
+        if name in variables:
+            return variables[name]
+        if use_environ and name in os.environ:
+            return os.environ[name]
+        raise ValueError(
+            f"Unresolved reference '${{{name}}}' in '{_format_path(path)}'"
+        )
+
+    max_length = limits.max_interpolated_length if limits is not None else None
+    rendered_length = 0
+
+    def render(path):
+        nonlocal rendered_length
+        parent, key, segments = templates[path]
+        if len(segments) == 1 and isinstance(segments[0], tuple):
+            value = lookup(segments[0][0], path)
+        else:
+            parts = [
+                (
+                    _to_text(lookup(segment[0], path))
+                    if isinstance(segment, tuple)
+                    else segment
+                )
+                for segment in segments
+            ]
+            # Checked before joining, so nested references cannot build up
+            # huge strings (e.g. a = "${b}${b}", b = "${c}${c}", ...)
+            rendered_length += sum(map(len, parts))
+            if max_length is not None and rendered_length > max_length:
+                raise LimitExceededError(
+                    f"Interpolation exceeds the limit of {max_length} characters "
+                    f"at '{_format_path(path)}'."
+                )
+            value = "".join(parts)
+        # Store immediately, so later lookups see the resolved value
+        parent[key] = value
+
+    # Iterative depth-first topological resolution
+    resolved = set()
+    for start in templates:
+        if start in resolved:
+            continue
+        stack = [(start, iter(dependencies[start]))]
+        on_stack = {start}
+        while stack:
+            path, pending = stack[-1]
+            for dep in pending:
+                if dep in resolved:
+                    continue
+                if dep in on_stack:
+                    chain = [p for p, _ in stack]
+                    chain = chain[chain.index(dep) :] + [dep]
+                    raise ValueError(
+                        "Circular reference: "
+                        + " -> ".join(_format_path(p) for p in chain)
+                    )
+                on_stack.add(dep)
+                stack.append((dep, iter(dependencies[dep])))
+                break
+            else:
+                if path in templates:
+                    render(path)
+                resolved.add(path)
+                on_stack.discard(path)
+                stack.pop()
+    return data
@@ -0,0 +1,255 @@
+import os
+import re
+from dataclasses import dataclass
+from xml.parsers import expat
+
+from ruamel.yaml.composer import Composer
+from ruamel.yaml.events import AliasEvent, MappingStartEvent, SequenceStartEvent
+
+# Resource limits for parsing untrusted inputs.
+# Every check runs before or while a file is parsed, so a hostile file
+# (YAML alias bomb, deeply nested JSON, XML with a DTD) fails fast instead of
+# exhausting memory or CPU:
+#   - the input size is checked before the file is opened,
+#   - JSON and TOML are pre-scanned for nesting depth and value count, and
+#     parsed TOML is checked again for nesting through table headers,
+#   - YAML is checked node by node while composing, with aliases counted at
+#     their expanded size,
+#   - XML elements are counted by the expat parser and DTDs are rejected,
+#   - flat .env/INI data is checked right after loading,
+#   - ${...} interpolation is capped in the total length it renders.
+
+
+class LimitExceededError(ValueError):
+    """Raised when an input exceeds one of the configured ParseLimits."""
+
+
+@dataclass
+class ParseLimits:
+    """Limits enforced by load_config(); None disables a limit."""
+
+    max_input_bytes: int = None
+    max_depth: int = None
+    max_nodes: int = None
+    max_aliases: int = None
+    # Total length of the strings rendered by interpolate_config
+    max_interpolated_length: int = None
+    allow_dtd: bool = False
+
+
+# Preset for files from untrusted sources
+UNTRUSTED_LIMITS = ParseLimits(
+    max_input_bytes=16 * 1024 * 1024,
+    max_depth=64,
+    max_nodes=1_000_000,
+    max_aliases=100,
+    max_interpolated_length=16 * 1024 * 1024,
+    allow_dtd=False,
+)
+
+# Tokens relevant to depth and value counting. Strings (and TOML comments)
+# are matched as a whole so that brackets inside them are ignored.
+_JSON_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|[\[{\]}]|[^\s,:\[\]{}"]+')
+_TOML_TOKENS = re.compile(
+    r'"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:[^"\\\n]|\\.)*"|\'[^\'\n]*\''
+    r"|#[^\n]*|[\[{\]}]|[^\s,=\[\]{}\"'#]+"
+)
+
+
+def check_input_size(file_path, limits):
+    """Fails if the file is larger than limits.max_input_bytes."""
+    if limits.max_input_bytes is None:
+        return
+    size = os.path.getsize(file_path)
+    if size > limits.max_input_bytes:
+        raise LimitExceededError(
+            f"Input '{file_path}' is {size} bytes, which exceeds the limit of "
+            f"{limits.max_input_bytes} bytes."
+        )
+
+
+def _depth_error(limits):
+    return LimitExceededError(
+        f"Input exceeds the maximum nesting depth of {limits.max_depth}."
+    )
+
+
+def _nodes_error(limits):
+    return LimitExceededError(
+        f"Input exceeds the maximum of {limits.max_nodes} values."
+    )
+
+
+def check_text(text, format, limits):
+    """Pre-scans JSON or TOML text for nesting depth and value count.
+
+    The scan is a single regular-expression pass, so it is cheap compared to
+    parsing and runs before the (recursive) parsers see the text.
+    """
+    if limits.max_depth is None and limits.max_nodes is None:
+        return
+    pattern = _JSON_TOKENS if format == "json" else _TOML_TOKENS
+    max_depth = limits.max_depth
+    max_nodes = limits.max_nodes
+    depth = nodes = 0
+    for match in pattern.finditer(text):
+        first = match.group()[0]
+        if first in "[{":
+            depth += 1
+            nodes += 1
+            if max_depth is not None and depth > max_depth:
+                raise _depth_error(limits)
+        elif first in "]}":
+            depth -= 1
+            continue
+        elif first == "#":
+            continue
+        else:
+            nodes += 1
+        if max_nodes is not None and nodes > max_nodes:
+            raise _nodes_error(limits)
+
+
+def check_tree(data, limits):
+    """Checks depth and value count of already loaded data.
+
+    Used for flat .env/INI data and for TOML documents, whose table headers
+    and dotted keys nest without any brackets for check_text to count.
+    """
+    if limits.max_depth is None and limits.max_nodes is None:
+        return
+    nodes = 0
+    stack = [(data, 0)]
+    while stack:
+        node, depth = stack.pop()
+        nodes += 1
+        if limits.max_nodes is not None and nodes > limits.max_nodes:
+            raise _nodes_error(limits)
+        if isinstance(node, (dict, list)):
+            if limits.max_depth is not None and depth >= limits.max_depth:
+                raise _depth_error(limits)
+            values = node.values() if isinstance(node, dict) else node
+            stack.extend((value, depth + 1) for value in values)
+
+
+class LimitedComposer(Composer):
+    """YAML composer enforcing ParseLimits while nodes are built.
+
+    Aliases are counted, and each one adds the size of the node it refers
+    to, so alias bombs are caught by max_nodes before anything expands them.
+    The limits are read from the `parse_limits` attribute of the YAML instance.
+    """
+
+    def __init__(self, loader=None):
+        super().__init__(loader)
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.node_count = 0
+        self.alias_count = 0
+        self.collection_depth = 0
+        self.anchor_sizes = {}
+
+    def compose_document(self, *args, **kwargs):
+        # Limits apply per document of a multi-document stream
+        self._reset_counters()
+        return super().compose_document(*args, **kwargs)
+
+    def compose_node(self, parent, index):
+        limits = self.loader.parse_limits
+        if self.parser.check_event(AliasEvent):
+            anchor = self.parser.peek_event().anchor
+            self.alias_count += 1
+            if limits.max_aliases is not None and self.alias_count > limits.max_aliases:
+                raise LimitExceededError(
+                    f"Input exceeds the maximum of {limits.max_aliases} YAML aliases."
+                )
+            self._count_nodes(self.anchor_sizes.get(anchor, 1), limits)
+            return super().compose_node(parent, index)
+
+        # Depth is tracked here: older ruamel.yaml Composers have no self.depth
+        collection = self.parser.check_event(MappingStartEvent, SequenceStartEvent)
+        if (
+            collection
+            and limits.max_depth is not None
+            and self.collection_depth >= limits.max_depth
+        ):
+            raise _depth_error(limits)
+        self._count_nodes(1, limits)
+        anchor = self.parser.peek_event().anchor
+        before = self.node_count
+        if collection:
+            self.collection_depth += 1
+            try:
+                node = super().compose_node(parent, index)
+            finally:
+                self.collection_depth -= 1
+        else:
+            node = super().compose_node(parent, index)
+        if anchor is not None:
+            self.anchor_sizes[anchor] = self.node_count - before + 1
+        return node
+
+    def _count_nodes(self, count, limits):
+        self.node_count += count
+        if limits.max_nodes is not None and self.node_count > limits.max_nodes:
+            raise _nodes_error(limits)
+
+
+class LimitedExpat:
+    """Stand-in for the expat module, passed to xmltodict.parse(expat=...)."""
+
+    def __init__(self, limits):
+        self.limits = limits
+
+    def ParserCreate(self, *args, **kwargs):
+        return _LimitedParser(expat.ParserCreate(*args, **kwargs), self.limits)
+
+
+class _LimitedParser:
+    """Wraps an expat parser, counting elements as xmltodict's handlers run."""
+
+    def __init__(self, parser, limits):
+        object.__setattr__(self, "_parser", parser)
+        object.__setattr__(self, "_limits", limits)
+        object.__setattr__(self, "_depth", 0)
+        object.__setattr__(self, "_nodes", 0)
+        if not limits.allow_dtd:
+            parser.StartDoctypeDeclHandler = self._forbid_dtd
+
+    def _forbid_dtd(self, *args):
+        raise LimitExceededError("XML document type declarations (DTDs) are disabled.")
+
+    def __getattr__(self, name):
+        return getattr(self._parser, name)
+
+    def __setattr__(self, name, value):
+        if name == "StartElementHandler":
+            value = self._wrap_start(value)
+        elif name == "EndElementHandler":
+            value = self._wrap_end(value)
+        setattr(self._parser, name, value)
+
+    def _wrap_start(self, handler):
+        limits = self._limits
+
+        def start_element(name, attrs):
+            depth = self._depth + 1
+            # ordered_attributes gives [name, value, ...]
+            nodes = self._nodes + 1 + len(attrs) // 2
+            if limits.max_depth is not None and depth > limits.max_depth:
+                raise _depth_error(limits)
+            if limits.max_nodes is not None and nodes > limits.max_nodes:
+                raise _nodes_error(limits)
+            object.__setattr__(self, "_depth", depth)
+            object.__setattr__(self, "_nodes", nodes)
+            return handler(name, attrs)
+
+        return start_element
+
+    def _wrap_end(self, handler):
+        def end_element(name):
+            object.__setattr__(self, "_depth", self._depth - 1)
+            return handler(name)
+
+        return end_element
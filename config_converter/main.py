@@ -1,5 +1,10 @@
 import click
+import json
+from dataclasses import replace
 from .converter import convert
+from .limits import UNTRUSTED_LIMITS, ParseLimits
+from .planner import parse_size
+from .validation import DEFAULT_MAX_ERRORS, SchemaValidationError
 import sys  # Import sys for exit codes
 
 
@@ -8,17 +13,19 @@ import sys  # Import sys for exit codes
     "--input-file",
     "-i",
     required=True,
-    type=click.Path(exists=True, dir_okay=False),
-    help="Path to the input configuration file.",
+    type=click.Path(exists=True),
+    help="Path to the input configuration file (a directory of shards with --join).",
 )
 @click.option(
     "--source-format",
     "-s",
-    required=True,
+    default="auto",
+    show_default=True,
     type=click.Choice(
-        ["json", "yaml", "toml", "env", "ini", "xml"], case_sensitive=False
+        ["auto", "json", "yaml", "toml", "env", "ini", "xml"], case_sensitive=False
     ),
-    help="Format of the input file.",
+    help="Format of the input file; 'auto' detects it from the extension "
+    "or the first few KB of content.",
 )
 @click.option(
     "--target-format",
@@ -33,8 +40,9 @@ import sys  # Import sys for exit codes
     "--output-file",
     "-o",
     required=True,
-    type=click.Path(dir_okay=False),
-    help="Path to save the converted configuration file.",
+    type=click.Path(),
+    help="Path to save the converted configuration file "
+    "(a directory of shards with --split-by).",
 )
 @click.option(
     "--input-schema",
@@ -46,24 +54,224 @@ import sys  # Import sys for exit codes
     type=click.Path(exists=True, dir_okay=False),
     help="Path to a JSON schema file to validate the output against.",
 )
+@click.option(
+    "--all-errors",
+    is_flag=True,
+    help="Report all schema validation errors instead of only the first one.",
+)
+@click.option(
+    "--max-errors",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_ERRORS,
+    show_default=True,
+    help="Maximum number of errors collected with --all-errors.",
+)
+@click.option(
+    "--error-report",
+    type=click.Path(dir_okay=False),
+    help="Write schema validation errors as a JSON report to this path.",
+)
+@click.option(
+    "--coerce-schema",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Path to a JSON schema used to convert string values (from .env, "
+    "INI or XML sources) to integers, numbers, booleans and nulls.",
+)
+@click.option(
+    "--separator",
+    help="Separator for flattened keys in .env/INI files (default '__' for "
+    ".env and '.' for INI output). When given, flat .env/INI input is "
+    "unflattened into nested data.",
+)
+@click.option(
+    "--env-prefix",
+    help="Prefix for .env keys: prepended on output, filtered and stripped "
+    "on input (e.g. APP for APP__DATABASE__HOST).",
+)
+@click.option(
+    "--multi-document",
+    is_flag=True,
+    help="Treat a YAML input as a '---'-separated stream of documents and "
+    "convert them one at a time (NDJSON for JSON output, otherwise one "
+    "numbered output file per document).",
+)
+@click.option(
+    "--per-document-files",
+    is_flag=True,
+    help="With --multi-document and JSON output, write one file per document "
+    "instead of NDJSON.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of workers: threads writing documents in --multi-document "
+    "mode, threads writing or reading shards with --split-by/--join, processes "
+    "validating large arrays/mappings with --all-errors.",
+)
+@click.option(
+    "--split-by",
+    help="Write each section under this dotted path ('.' for the top level) "
+    "as a separate file in the output directory.",
+)
+@click.option(
+    "--join",
+    is_flag=True,
+    help="Assemble a directory of shards into one document "
+    "(nested under --split-by, if given).",
+)
+@click.option(
+    "--interpolate",
+    is_flag=True,
+    help="Resolve ${VAR} and ${section.key} references in string values.",
+)
+@click.option(
+    "--env-file",
+    "env_files",
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="A .env file providing variables for --interpolate (repeatable).",
+)
+@click.option(
+    "--intern",
+    "intern_strings",
+    is_flag=True,
+    help="Deduplicate repeated keys and short values while loading JSON, XML "
+    "and YAML to reduce memory use.",
+)
+@click.option(
+    "--untrusted",
+    is_flag=True,
+    help="Parse the input with safe limits for files from untrusted sources "
+    "(16M, depth 64, 1M values, 100 YAML aliases, 16M of interpolated "
+    "text, no XML DTDs).",
+)
+@click.option(
+    "--max-input-size",
+    help="Largest accepted input file, e.g. 10M. Overrides the --untrusted value.",
+)
+@click.option(
+    "--max-depth",
+    type=click.IntRange(min=1),
+    help="Maximum nesting depth of the input. Overrides the --untrusted value.",
+)
+@click.option(
+    "--max-nodes",
+    type=click.IntRange(min=1),
+    help="Maximum number of values in the input. Overrides the --untrusted value.",
+)
+@click.option(
+    "--max-aliases",
+    type=click.IntRange(min=0),
+    help="Maximum number of YAML aliases. Overrides the --untrusted value.",
+)
+@click.option(
+    "--max-interpolated-size",
+    help="Maximum amount of text rendered by --interpolate, e.g. 1M. "
+    "Overrides the --untrusted value.",
+)
+@click.option(
+    "--allow-dtd",
+    is_flag=True,
+    help="Accept XML inputs with a document type declaration when limits apply.",
+)
+@click.option(
+    "--max-memory",
+    help="Memory budget for the conversion, e.g. 512M or 2G. "
+    "Inputs expected to exceed it are refused.",
+)
+@click.option(
+    "--verbose",
+    "-v",
+    is_flag=True,
+    help="Print the execution plan chosen for the conversion.",
+)
 def main(
-    input_file, source_format, target_format, output_file, input_schema, output_schema
+    input_file,
+    source_format,
+    target_format,
+    output_file,
+    input_schema,
+    output_schema,
+    all_errors,
+    max_errors,
+    error_report,
+    coerce_schema,
+    separator,
+    env_prefix,
+    multi_document,
+    per_document_files,
+    workers,
+    split_by,
+    join,
+    interpolate,
+    env_files,
+    intern_strings,
+    untrusted,
+    max_input_size,
+    max_depth,
+    max_nodes,
+    max_aliases,
+    max_interpolated_size,
+    allow_dtd,
+    max_memory,
+    verbose,
 ):
     """Universal Config Converter CLI"""
     try:
-        convert(
+        limits = UNTRUSTED_LIMITS if untrusted else None
+        overrides = {
+            "max_input_bytes": parse_size(max_input_size),
+            "max_depth": max_depth,
+            "max_nodes": max_nodes,
+            "max_aliases": max_aliases,
+            "max_interpolated_length": parse_size(max_interpolated_size),
+        }
+        overrides = {
+            key: value for key, value in overrides.items() if value is not None
+        }
+        if allow_dtd:
+            overrides["allow_dtd"] = True
+        if overrides:
+            limits = replace(limits or ParseLimits(), **overrides)
+        source_format = convert(
             input_file,
             source_format,
             target_format,
             output_file,
             input_schema,
             output_schema,
+            max_memory=parse_size(max_memory),
+            verbose=verbose,
+            coerce_schema=coerce_schema,
+            separator=separator,
+            env_prefix=env_prefix,
+            multi_document=multi_document,
+            per_document_files=per_document_files,
+            workers=workers,
+            interpolate=interpolate,
+            env_files=env_files,
+            all_errors=all_errors,
+            max_errors=max_errors,
+            split_by=split_by,
+            join=join,
+            intern_strings=intern_strings,
+            limits=limits,
         )
         click.echo(
             f"Successfully converted '{input_file}' ({source_format}) to "
             f"'{output_file}' ({target_format})"
         )
     except ValueError as e:  # Catch specific errors like validation errors
+        if error_report and isinstance(e, SchemaValidationError):
+            with open(error_report, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"input_file": input_file, "errors": e.errors},
+                    f,
+                    indent=4,
+                    ensure_ascii=False,
+                )
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)  # Exit with non-zero status for errors
     except Exception as e:
@@ -0,0 +1,172 @@
+import os
+from dataclasses import dataclass
+
+# Execution planning for convert().
+# Before anything is parsed we look at the input size and the formats involved,
+# estimate the peak memory of the conversion and pick how the loader/saver
+# should run. The estimates are deliberately rough: they only need to be good
+# enough to tell a small config from a multi-gigabyte export.
+
+# Strategy names reported in ExecutionPlan.strategy
+STRATEGY_IN_MEMORY = "in-memory"
+STRATEGY_STREAMING = "streaming"
+
+# Inputs above this size go through the streaming path even without a budget.
+STREAMING_THRESHOLD = 64 * 1024 * 1024  # 64 MiB
+
+# Approximate ratio between the size of the parsed Python tree and the size of
+# the source file. ruamel.yaml (round-trip) and tomlkit keep comments and
+# formatting for every node, so they are much heavier than plain dicts.
+_TREE_EXPANSION = {
+    "json": 6,
+    "yaml": 12,
+    "toml": 12,
+    "xml": 6,
+    "ini": 5,
+    "env": 4,
+}
+
+# Loaders that read the whole file into a string before parsing in the
+# in-memory path. The raw text is alive at the same time as the parsed tree.
+_READS_WHOLE_INPUT = {"json", "toml", "xml", "env"}
+
+# Loaders that can consume a file handle incrementally in the streaming path.
+# (yaml and ini already read their input incrementally in both paths.)
+_STREAMING_READERS = {"xml"}
+
+# Writers that build the full output string before writing it in the
+# in-memory path, and writers that can write straight into the output file.
+_BUILDS_WHOLE_OUTPUT = {"xml", "toml"}
+_STREAMING_WRITERS = {"xml"}
+
+_SIZE_SUFFIXES = {
+    "": 1,
+    "B": 1,
+    "K": 1024,
+    "KB": 1024,
+    "M": 1024**2,
+    "MB": 1024**2,
+    "G": 1024**3,
+    "GB": 1024**3,
+}
+
+
+@dataclass
+class ExecutionPlan:
+    """Decision taken by plan_conversion() for a single conversion."""
+
+    strategy: str
+    input_size: int
+    estimated_peak: int
+    max_memory: int = None
+    reason: str = ""
+
+    @property
+    def streaming(self):
+        return self.strategy == STRATEGY_STREAMING
+
+    def describe(self):
+        """Returns a one-line, human readable summary of the plan."""
+        budget = (
+            f", budget {format_size(self.max_memory)}"
+            if self.max_memory is not None
+            else ""
+        )
+        return (
+            f"Execution plan: {self.strategy} (input {format_size(self.input_size)}, "
+            f"estimated peak {format_size(self.estimated_peak)}{budget}) - "
+            f"{self.reason}"
+        )
+
+
+def parse_size(value):
+    """Parses a size such as '512M', '2GB' or '1048576' into bytes."""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().upper()
+    number = text.rstrip("KMGB")
+    suffix = text[len(number) :]
+    if suffix not in _SIZE_SUFFIXES:
+        raise ValueError(f"Invalid size: '{value}'")
+    try:
+        return int(float(number) * _SIZE_SUFFIXES[suffix])
+    except ValueError:
+        raise ValueError(f"Invalid size: '{value}'")
+
+
+def format_size(size):
+    """Formats a byte count for display, e.g. 1536 -> '1.5 KiB'."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def estimate_peak_memory(
+    input_size, source_format, target_format, streaming=False, validate=False
+):
+    """Estimates the peak memory (in bytes) needed to convert a file."""
+    tree = input_size * _TREE_EXPANSION.get(source_format, 8)
+    peak = tree
+
+    if source_format in _READS_WHOLE_INPUT and not (
+        streaming and source_format in _STREAMING_READERS
+    ):
+        peak += input_size
+
+    # Validation works on a plain dict/list copy of ruamel/tomlkit trees.
+    if validate and source_format in ("yaml", "toml"):
+        peak += input_size * _TREE_EXPANSION["json"]
+
+    if target_format in _BUILDS_WHOLE_OUTPUT and not (
+        streaming and target_format in _STREAMING_WRITERS
+    ):
+        peak += input_size
+    return peak
+
+
+def plan_conversion(
+    input_file, source_format, target_format, max_memory=None, validate=False
+):
+    """Chooses between the in-memory and streaming paths for convert().
+
+    Raises ValueError if even the cheapest strategy is expected to exceed
+    max_memory (in bytes).
+    """
+    input_size = os.path.getsize(input_file)
+    in_memory_peak = estimate_peak_memory(
+        input_size, source_format, target_format, validate=validate
+    )
+    streaming_peak = estimate_peak_memory(
+        input_size, source_format, target_format, streaming=True, validate=validate
+    )
+
+    if max_memory is not None and streaming_peak > max_memory:
+        raise ValueError(
+            f"Estimated peak memory {format_size(streaming_peak)} for "
+            f"'{input_file}' exceeds the --max-memory budget of "
+            f"{format_size(max_memory)}."
+        )
+
+    if streaming_peak == in_memory_peak:
+        reason = f"no streaming path for {source_format} -> {target_format}"
+        strategy, peak = STRATEGY_IN_MEMORY, in_memory_peak
+    elif max_memory is not None and in_memory_peak > max_memory:
+        reason = "in-memory estimate exceeds the memory budget"
+        strategy, peak = STRATEGY_STREAMING, streaming_peak
+    elif input_size > STREAMING_THRESHOLD:
+        reason = f"input larger than {format_size(STREAMING_THRESHOLD)}"
+        strategy, peak = STRATEGY_STREAMING, streaming_peak
+    else:
+        reason = "input is small enough to load at once"
+        strategy, peak = STRATEGY_IN_MEMORY, in_memory_peak
+
+    return ExecutionPlan(
+        strategy=strategy,
+        input_size=input_size,
+        estimated_peak=peak,
+        max_memory=max_memory,
+        reason=reason,
+    )
@@ -0,0 +1,173 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from jsonschema.exceptions import SchemaError
+from jsonschema.validators import validator_for
+
+# JSON schema validation with full error collection.
+# Validators are compiled once per schema file. For large top-level arrays and
+# mappings, the items are independent of each other, so they are validated in
+# a pool of worker processes against the matching subschema while the
+# container-level keywords (required, minItems, ...) are checked here.
+
+# Maximum number of errors collected by default
+DEFAULT_MAX_ERRORS = 100
+
+# Minimum number of top-level items before validation is split across workers
+PARALLEL_THRESHOLD = 1000
+
+# Compiled validators, keyed on schema path and modification time
+_VALIDATOR_CACHE = {}
+
+# Validator compiled once per worker process by _init_worker
+_worker_validator = None
+_worker_subvalidators = {}
+
+
+class SchemaValidationError(ValueError):
+    """Raised when data does not match a schema.
+
+    `errors` is a list of dicts with the JSON pointer of the invalid value
+    ('path'), the error 'message', the failing 'validator' keyword and the
+    JSON pointer of that keyword in the schema ('schema_path').
+    """
+
+    def __init__(self, message, errors):
+        super().__init__(message)
+        self.errors = errors
+
+
+def load_validator(schema_path):
+    """Loads a JSON schema file and returns a compiled (cached) validator."""
+    try:
+        real_path = os.path.realpath(schema_path)
+        cache_key = (real_path, os.path.getmtime(real_path))
+        validator = _VALIDATOR_CACHE.get(cache_key)
+        if validator is None:
+            with open(real_path, "r", encoding="utf-8") as f:
+                schema = json.load(f)
+            validator_class = validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = _VALIDATOR_CACHE[cache_key] = validator_class(schema)
+    except (OSError, ValueError, SchemaError) as e:
+        raise ValueError(f"Error loading schema file '{schema_path}': {e}")
+    return validator
+
+
+def json_pointer(path):
+    """Formats a path (sequence of keys/indices) as a JSON pointer."""
+    return "".join(
+        "/" + str(part).replace("~", "~0").replace("/", "~1") for part in path
+    )
+
+
+def error_record(error, data_prefix=(), schema_prefix=()):
+    """Converts a jsonschema ValidationError into a report entry."""
+    return {
+        "path": json_pointer(data_prefix + tuple(error.absolute_path)),
+        "message": error.message,
+        "validator": error.validator,
+        "schema_path": json_pointer(schema_prefix + tuple(error.absolute_schema_path)),
+    }
+
+
+def _collect(validator, data, max_errors, data_prefix=(), schema_prefix=()):
+    errors = []
+    for error in validator.iter_errors(data):
+        errors.append(error_record(error, data_prefix, schema_prefix))
+        if max_errors is not None and len(errors) >= max_errors:
+            break
+    return errors
+
+
+def _split_schema(schema, data):
+    """Splits validation of a top-level array/mapping into independent items.
+
+    Returns (container_schema, items) where items are
+    (data_key, schema_prefix, value) tuples, or None if data cannot be split.
+    """
+    if not isinstance(schema, dict):
+        return None
+    if isinstance(data, list):
+        if not isinstance(schema.get("items"), dict) or "prefixItems" in schema:
+            return None
+        container = dict(schema, items={})
+        items = [(index, ("items",), value) for index, value in enumerate(data)]
+        return container, items
+    if isinstance(data, dict) and "patternProperties" not in schema:
+        properties = schema.get("properties", {})
+        additional = schema.get("additionalProperties")
+        if not isinstance(properties, dict):
+            return None
+        if not properties and not isinstance(additional, dict):
+            return None
+        # Keep the property names so required/additionalProperties still work
+        container = dict(schema, properties={key: {} for key in properties})
+        if isinstance(additional, dict):
+            container["additionalProperties"] = {}
+        items = []
+        for key, value in data.items():
+            if key in properties:
+                items.append((key, ("properties", key), value))
+            elif isinstance(additional, dict):
+                items.append((key, ("additionalProperties",), value))
+        return container, items
+    return None
+
+
+def _init_worker(schema):
+    global _worker_validator
+    _worker_validator = validator_for(schema)(schema)
+    _worker_subvalidators.clear()
+
+
+def _validate_chunk(items, max_errors):
+    errors = []
+    for data_key, schema_prefix, value in items:
+        validator = _worker_subvalidators.get(schema_prefix)
+        if validator is None:
+            subschema = _worker_validator.schema
+            for part in schema_prefix:
+                subschema = subschema[part]
+            validator = _worker_validator.evolve(schema=subschema)
+            _worker_subvalidators[schema_prefix] = validator
+        remaining = None if max_errors is None else max_errors - len(errors)
+        errors.extend(_collect(validator, value, remaining, (data_key,), schema_prefix))
+        if max_errors is not None and len(errors) >= max_errors:
+            break
+    return errors
+
+
+def collect_errors(data, schema_path, max_errors=DEFAULT_MAX_ERRORS, workers=None):
+    """Validates data and returns all errors (up to max_errors) as dicts.
+
+    With workers > 1, the items of a large top-level array or mapping are
+    validated in parallel in worker processes. data must contain plain
+    Python types (dict, list, str, ...) so it can be sent to the workers.
+    """
+    validator = load_validator(schema_path)
+    split = None
+    if workers and workers > 1:
+        split = _split_schema(validator.schema, data)
+    if split is None or len(split[1]) < PARALLEL_THRESHOLD:
+        return _collect(validator, data, max_errors)
+
+    container_schema, items = split
+    errors = _collect(validator.evolve(schema=container_schema), data, max_errors)
+    # A few chunks per worker keeps them busy without pickling every item
+    chunk_size = max(1, -(-len(items) // (workers * 4)))
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(validator.schema,)
+    ) as executor:
+        futures = [
+            executor.submit(_validate_chunk, chunk, max_errors) for chunk in chunks
+        ]
+        # Results are merged in item order, so the report is deterministic
+        for future in futures:
+            if max_errors is not None and len(errors) >= max_errors:
+                future.cancel()
+                continue
+            errors.extend(future.result())
+    return errors if max_errors is None else errors[:max_errors]
@@ -5,10 +5,31 @@ import json
 import tomlkit
 from config_converter.converter import (
     convert,
+    detect_format,
     load_config,
+    load_yaml_documents,
     save_config,
+    split_config,
+    validate_data,
     _convert_tomlkit_to_standard,
 )
+from config_converter.coercion import (
+    compile_schema,
+    compile_type_map,
+    load_coercion_plan,
+)
+from config_converter.flatten import flatten, unflatten
+from config_converter.interning import InternTable
+from config_converter.interpolation import interpolate_config
+from config_converter.limits import UNTRUSTED_LIMITS, LimitExceededError, ParseLimits
+from config_converter.planner import (
+    STRATEGY_IN_MEMORY,
+    STRATEGY_STREAMING,
+    estimate_peak_memory,
+    parse_size,
+    plan_conversion,
+)
+from config_converter.validation import SchemaValidationError, collect_errors
 from dotenv import dotenv_values
 import configparser
 import xmltodict
@@ -233,7 +254,7 @@ def test_env_to_json(temp_files):
 
 
 def test_json_to_env(temp_files):
-    """Test converting JSON to .env (only top-level simple values)."""
+    """Test converting JSON to .env (nested values are flattened)."""
     # Create a simplified JSON input for this test
     simple_json_path = temp_files["json_in"].parent / "simple.json"
     simple_data = {
@@ -241,15 +262,17 @@ def test_json_to_env(temp_files):
         "RETRIES": 5,
         "ENABLED": False,
         "FLOAT_VAL": 1.23,
-        "NESTED": {"a": 1},  # This should be ignored
-        "LIST_VAL": [1, 2],  # This should be ignored
+        "NESTED": {"a": 1},
+        "LIST_VAL": [1, 2],
     }
     expected_env_data = {
         "SERVICE_URL": "https://api.example.com",
         "RETRIES": "5",
         "ENABLED": "false",
         "FLOAT_VAL": "1.23",
-        # Nested and List are excluded
+        "NESTED__a": "1",
+        "LIST_VAL__0": "1",
+        "LIST_VAL__1": "2",
     }
     with open(simple_json_path, "w") as f:
         json.dump(simple_data, f, indent=4)
@@ -538,3 +561,756 @@ def test_toml_comment_preservation(temp_files):
     # Assert that the output content is identical to the input content
     # after stripping leading/trailing whitespace.
     assert output_content.strip() == input_content.strip()
+
+
+# --- Execution Planner Tests --- #
+
+
+def test_plan_small_input_in_memory(temp_files):
+    """Test that small inputs are converted in memory."""
+    plan = plan_conversion(temp_files["xml_in"], "xml", "json")
+    assert plan.strategy == STRATEGY_IN_MEMORY
+    assert plan.input_size == temp_files["xml_in"].stat().st_size
+
+
+def test_plan_budget_selects_streaming(temp_files):
+    """Test that a tight budget moves XML conversion to the streaming path."""
+    size = temp_files["xml_in"].stat().st_size
+    in_memory = estimate_peak_memory(size, "xml", "xml")
+    streaming = estimate_peak_memory(size, "xml", "xml", streaming=True)
+    assert streaming < in_memory
+    plan = plan_conversion(temp_files["xml_in"], "xml", "xml", max_memory=streaming)
+    assert plan.strategy == STRATEGY_STREAMING
+    assert plan.estimated_peak == streaming
+
+
+def test_plan_budget_exceeded(temp_files):
+    """Test that conversions over the memory budget are refused before loading."""
+    output_path = temp_files["out"].with_suffix(".yaml")
+    with pytest.raises(ValueError, match="exceeds the --max-memory budget"):
+        convert(temp_files["json_in"], "json", "yaml", output_path, max_memory=16)
+    assert not output_path.exists()
+    with pytest.raises(ValueError, match="not supported for multi-document input"):
+        convert(
+            temp_files["yaml_in"],
+            "yaml",
+            "json",
+            output_path,
+            multi_document=True,
+            max_memory=1024**3,
+        )
+    with pytest.raises(ValueError, match="not supported for joined shards"):
+        convert(
+            temp_files["out"].parent,
+            "json",
+            "yaml",
+            output_path,
+            join=True,
+            max_memory=1024**3,
+        )
+
+
+def test_streaming_xml_round_trip(temp_files):
+    """Test that the streaming XML path produces the same data and output."""
+    assert (
+        load_config(temp_files["xml_in"], "xml", streaming=True)
+        == XML_SAMPLE_DATA_FROM_STR
+    )
+    in_memory_path = temp_files["out"].parent / "in_memory.xml"
+    streaming_path = temp_files["out"].parent / "streaming.xml"
+    save_config(XML_SAMPLE_DATA_FROM_STR, in_memory_path, "xml")
+    save_config(XML_SAMPLE_DATA_FROM_STR, streaming_path, "xml", streaming=True)
+    assert streaming_path.read_text() == in_memory_path.read_text()
+
+
+def test_parse_size():
+    """Test parsing of --max-memory values."""
+    assert parse_size("512") == 512
+    assert parse_size("2K") == 2048
+    assert parse_size("1.5mb") == int(1.5 * 1024**2)
+    assert parse_size("1G") == 1024**3
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size("lots")
+
+
+# --- Type Coercion Tests --- #
+
+
+def test_env_to_json_with_coerce_schema(tmp_path):
+    """Test that .env strings are coerced to the types in a JSON schema."""
+    env_path = tmp_path / "input.env"
+    env_path.write_text("PORT=5432\nDEBUG=true\nRATIO=0.5\nNAME=app\nTIMEOUT=\n")
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(
+        json.dumps(
+            {
+                "type": "object",
+                "properties": {
+                    "PORT": {"type": "integer"},
+                    "DEBUG": {"type": "boolean"},
+                    "RATIO": {"type": "number"},
+                    "NAME": {"type": "string"},
+                    "TIMEOUT": {"type": ["integer", "null"]},
+                },
+            }
+        )
+    )
+    output_path = tmp_path / "output.json"
+    convert(env_path, "env", "json", output_path, coerce_schema=schema_path)
+    assert load_config(output_path, "json") == {
+        "PORT": 5432,
+        "DEBUG": True,
+        "RATIO": 0.5,
+        "NAME": "app",
+        "TIMEOUT": None,
+    }
+
+
+def test_coerce_schema_refs_and_items():
+    """Test compiling $ref, array items and additionalProperties."""
+    plan = compile_schema(
+        {
+            "definitions": {"port": {"type": "integer"}},
+            "type": "object",
+            "properties": {
+                "ports": {"type": "array", "items": {"$ref": "#/definitions/port"}},
+                "limits": {"additionalProperties": {"type": "number"}},
+            },
+        }
+    )
+    data = {"ports": ["80", "443"], "limits": {"cpu": "1.5", "mem": "512"}}
+    assert plan.apply(data) == {
+        "ports": [80, 443],
+        "limits": {"cpu": 1.5, "mem": 512},
+    }
+
+
+def test_coerce_leaves_invalid_values(temp_files):
+    """Test that values that cannot be coerced are left unchanged."""
+    plan = compile_type_map({"database.port": "integer", "database.enabled": "boolean"})
+    data = load_config(temp_files["ini_in"], "ini", coercion=plan)
+    assert data["database"] == {"host": "db.example.com", "port": 1521, "enabled": True}
+    assert plan.apply({"database": {"port": "n/a"}}) == {"database": {"port": "n/a"}}
+    plan = compile_type_map({"ratio": "number"})
+    for text in ("nan", "inf", "-Infinity"):
+        assert plan.apply({"ratio": text}) == {"ratio": text}
+
+
+def test_coerce_additional_properties_skip_declared():
+    """Test that additionalProperties does not apply to declared properties."""
+    plan = compile_schema(
+        {
+            "properties": {"name": {"type": "string"}, "port": {"type": "integer"}},
+            "additionalProperties": {"type": "integer"},
+        }
+    )
+    data = {"name": "123", "port": "80", "retries": "3"}
+    assert plan.apply(data) == {"name": "123", "port": 80, "retries": 3}
+
+
+def test_coerce_type_map_wildcard_next_to_exact_path():
+    """Test that '*' rules still apply where a more specific rule exists."""
+    plan = compile_type_map(
+        {"services.*.port": "integer", "services.web.replicas": "integer"}
+    )
+    data = {
+        "services": {
+            "web": {"port": "80", "replicas": "2"},
+            "db": {"port": "5432", "replicas": "1"},
+        }
+    }
+    assert plan.apply(data) == {
+        "services": {
+            "web": {"port": 80, "replicas": 2},
+            "db": {"port": 5432, "replicas": "1"},
+        }
+    }
+
+
+def test_coerce_type_map_with_type_list():
+    """Test type maps using a JSON schema list of type names."""
+    plan = compile_type_map({"a": ["integer", "null"], "b": ["boolean"]})
+    assert plan is compile_type_map({"a": ["integer", "null"], "b": ["boolean"]})
+    data = {"a": "5", "b": "yes", "c": "7"}
+    assert plan.apply(data) == {"a": 5, "b": True, "c": "7"}
+    assert plan.apply({"a": "null"}) == {"a": None}
+
+
+def test_coercion_plan_cache(tmp_path):
+    """Test that compiled plans are reused across files."""
+    assert compile_type_map({"a": "integer"}) is compile_type_map({"a": "integer"})
+    assert load_coercion_plan(VALID_SCHEMA_PATH) is load_coercion_plan(
+        VALID_SCHEMA_PATH
+    )
+    with pytest.raises(ValueError, match="Error loading coercion schema"):
+        load_coercion_plan(tmp_path / "missing.json")
+
+
+# --- Flatten/Unflatten Tests --- #
+
+
+def test_flatten_unflatten_round_trip():
+    """Test flattening nested data and rebuilding it, including lists."""
+    flat = flatten(SAMPLE_DATA)
+    assert flat["database__host"] == "localhost"
+    assert flat["feature_flags__1"] == "beta_feature"
+    assert unflatten(flat) == SAMPLE_DATA
+    assert unflatten(flatten(SAMPLE_DATA, ".", prefix="app"), ".", prefix="app") == (
+        SAMPLE_DATA
+    )
+
+
+def test_flatten_deep_tree():
+    """Test that deep trees do not hit the recursion limit."""
+    data = leaf = {}
+    for _ in range(5000):
+        leaf["n"] = {}
+        leaf = leaf["n"]
+    leaf["value"] = 1
+    flat = flatten(data, ".")
+    assert list(flat.values()) == [1]
+    # Compare flat forms; == on the nested dicts would itself recurse
+    assert flatten(unflatten(flat, "."), ".") == flat
+
+
+def test_flatten_collisions():
+    """Test that keys mapping to the same flat key are reported."""
+    with pytest.raises(ValueError, match="Key collision"):
+        flatten({"a__b": 1, "a": {"b": 2}})
+    with pytest.raises(ValueError, match="Key collision"):
+        unflatten({"A": "1", "A__B": "2"})
+    with pytest.raises(ValueError, match="Key collision"):
+        unflatten({"A__B": "2", "A": "1"})
+
+
+def test_yaml_env_round_trip_with_prefix(temp_files):
+    """Test nested YAML -> .env -> JSON with a key prefix."""
+    env_path = temp_files["out"].with_suffix(".env")
+    convert(temp_files["yaml_in"], "yaml", "env", env_path, env_prefix="APP")
+    loaded_env = dotenv_values(env_path)
+    assert loaded_env["APP__database__port"] == "5432"
+    assert loaded_env["APP__database__enabled"] == "true"
+
+    env_path.write_text(env_path.read_text() + "OTHER_VAR=ignored\n")
+    json_path = temp_files["out"].with_suffix(".json")
+    convert(
+        env_path,
+        "env",
+        "json",
+        json_path,
+        separator="__",
+        env_prefix="APP",
+        coerce_schema=VALID_SCHEMA_PATH,
+    )
+    assert load_config(json_path, "json") == SAMPLE_DATA
+
+    # Without a separator the keys stay flat, but the prefix still filters
+    assert load_config(env_path, "env", prefix="APP")["database__port"] == "5432"
+    assert "OTHER_VAR" not in load_config(env_path, "env", prefix="APP")
+
+
+def test_flatten_skips_empty_containers(tmp_path, capsys):
+    """Test that empty dicts and lists are reported instead of dropped silently."""
+    env_path = tmp_path / "output.env"
+    save_config({"a": {}, "b": [], "c": 1}, env_path, "env")
+    assert env_path.read_text() == "c=1\n"
+    captured = capsys.readouterr().out
+    assert "Skipping empty dictionary for key 'a'" in captured
+    assert "Skipping empty list for key 'b'" in captured
+
+
+def test_nested_json_to_ini_round_trip(tmp_path):
+    """Test that nested sections are flattened for INI and restored on load."""
+    data = {"db": {"host": "localhost", "pool": {"size": "5", "hosts": ["a", "b"]}}}
+    ini_path = tmp_path / "output.ini"
+    save_config(data, ini_path, "ini")
+    config = configparser.ConfigParser()
+    config.read(ini_path)
+    assert config["db"]["pool.size"] == "5"
+    assert config["db"]["pool.hosts.1"] == "b"
+    assert load_config(ini_path, "ini", separator=".") == data
+
+
+# --- Multi-Document YAML Tests --- #
+
+MULTI_DOC_YAML = """
+kind: Service
+metadata:
+  name: web
+---
+kind: Deployment
+metadata:
+  name: web
+spec:
+  replicas: 3
+---
+"""
+
+
+def test_load_yaml_documents(tmp_path):
+    """Test that documents are yielded lazily and empty ones are skipped."""
+    p = tmp_path / "bundle.yaml"
+    p.write_text(MULTI_DOC_YAML)
+    documents = load_yaml_documents(p)
+    assert next(documents)["kind"] == "Service"
+    assert [d["kind"] for d in documents] == ["Deployment"]
+
+
+def test_multi_document_yaml_to_ndjson(tmp_path):
+    """Test converting a YAML stream to one JSON record per line."""
+    p = tmp_path / "bundle.yaml"
+    p.write_text(MULTI_DOC_YAML * 50)
+    output_path = tmp_path / "bundle.ndjson"
+    convert(p, "yaml", "json", output_path, multi_document=True, workers=4)
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert len(records) == 100
+    assert records[0] == {"kind": "Service", "metadata": {"name": "web"}}
+    assert records[-1]["spec"] == {"replicas": 3}
+
+
+def test_multi_document_yaml_to_files(tmp_path):
+    """Test converting a YAML stream to one output file per document."""
+    p = tmp_path / "bundle.yaml"
+    p.write_text(MULTI_DOC_YAML)
+    output_path = tmp_path / "bundle.toml"
+    convert(p, "yaml", "toml", output_path, multi_document=True, workers=2)
+    assert not output_path.exists()
+    second = load_config(tmp_path / "bundle-1.toml", "toml")
+    assert _convert_tomlkit_to_standard(second)["spec"] == {"replicas": 3}
+    assert (tmp_path / "bundle-0.toml").exists()
+
+
+def test_multi_document_requires_yaml(temp_files):
+    """Test that multi-document mode rejects non-YAML input."""
+    with pytest.raises(ValueError, match="only supported for YAML"):
+        convert(
+            temp_files["json_in"],
+            "json",
+            "yaml",
+            temp_files["out"].with_suffix(".yaml"),
+            multi_document=True,
+        )
+
+
+# --- Interpolation Tests --- #
+
+
+def test_interpolate_references():
+    """Test resolving chained, typed, variable and escaped references."""
+    data = {
+        "database": {"host": "db.local", "port": 5432},
+        "url": "postgres://${database.host}:${database.port}/${DB_NAME}",
+        "backup_url": "${url}?backup=true",
+        "port": "${database.port}",
+        "servers": ["${database.host}", "$${literal}"],
+    }
+    interpolate_config(data, {"DB_NAME": "app"}, use_environ=False)
+    assert data["url"] == "postgres://db.local:5432/app"
+    assert data["backup_url"] == "postgres://db.local:5432/app?backup=true"
+    assert data["port"] == 5432
+    assert data["servers"] == ["db.local", "${literal}"]
+
+
+def test_interpolate_long_chain():
+    """Test that long reference chains are resolved without recursion."""
+    data = {f"k{i}": f"${{k{i + 1}}}" for i in range(5000)}
+    data["k5000"] = "end"
+    interpolate_config(data, use_environ=False)
+    assert data["k0"] == "end"
+
+
+def test_interpolate_errors(monkeypatch):
+    """Test circular and unresolved references."""
+    with pytest.raises(ValueError, match="Circular reference: a -> b -> a"):
+        interpolate_config({"a": "${b}", "b": "x${a}"}, use_environ=False)
+    with pytest.raises(ValueError, match="Unresolved reference '\\$\\{MISSING\\}'"):
+        interpolate_config({"a": "${MISSING}"}, use_environ=False)
+    monkeypatch.setenv("FROM_ENVIRON", "yes")
+    assert interpolate_config({"a": "${FROM_ENVIRON}"}) == {"a": "yes"}
+    with pytest.raises(ValueError, match="Circular reference: a -> b -> b.c -> a"):
+        interpolate_config({"a": "${b}", "b": {"c": "${a}"}}, use_environ=False)
+
+
+def test_interpolate_many_container_references():
+    """Test that references to a mapping resolve every template below it."""
+    data = {"base": {f"k{i}": f"${{x}}{i}" for i in range(2000)}, "x": "v"}
+    data.update({f"r{i}": "${base}" for i in range(2000)})
+    interpolate_config(data, use_environ=False)
+    assert data["r1999"]["k1999"] == "v1999"
+
+
+def test_convert_with_interpolation(tmp_path):
+    """Test interpolation from an .env file before type coercion."""
+    ini_path = tmp_path / "input.ini"
+    ini_path.write_text(
+        "[server]\nport = ${PORT}\nurl = http://${HOST}:${server.port}\n"
+    )
+    env_path = tmp_path / "vars.env"
+    env_path.write_text("PORT=8080\nHOST=example.com\n")
+    output_path = tmp_path / "output.json"
+    convert(
+        ini_path,
+        "ini",
+        "json",
+        output_path,
+        interpolate=True,
+        env_files=[env_path],
+        type_map={"server.port": "integer"},
+    )
+    assert load_config(output_path, "json") == {
+        "server": {"port": 8080, "url": "http://example.com:8080"}
+    }
+
+
+def test_convert_env_with_interpolation(tmp_path):
+    """Test that .env references reach the interpolation stage unexpanded."""
+    env_path = tmp_path / "input.env"
+    env_path.write_text(
+        "DB__HOST=db.local\nURL=postgres://${DB.HOST}/x\nLIT=$${keep}\n"
+    )
+    output_path = tmp_path / "output.json"
+    convert(env_path, "env", "json", output_path, interpolate=True, separator="__")
+    assert load_config(output_path, "json") == {
+        "DB": {"HOST": "db.local"},
+        "URL": "postgres://db.local/x",
+        "LIT": "${keep}",
+    }
+    env_path.write_text("A=${B}\nB=${A}\n")
+    with pytest.raises(ValueError, match="Circular reference"):
+        convert(env_path, "env", "json", output_path, interpolate=True)
+
+
+# --- Full Error Collection Tests --- #
+
+SERVICES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "services": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}, "port": {"type": "integer"}},
+                "required": ["name"],
+            },
+        }
+    },
+    "required": ["services"],
+}
+
+
+def test_validation_collects_all_errors(tmp_path):
+    """Test that all errors are reported with JSON pointer paths."""
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(SERVICES_SCHEMA))
+    data = {"services": [{"name": "a", "port": "x"}, {"port": 1}, {"name": 3}]}
+    with pytest.raises(SchemaValidationError, match="failed with 3 error") as info:
+        validate_data(data, schema_path, collect_all=True)
+    assert sorted(error["path"] for error in info.value.errors) == [
+        "/services/0/port",
+        "/services/1",
+        "/services/2/name",
+    ]
+    with pytest.raises(SchemaValidationError) as info:
+        validate_data(data, schema_path, collect_all=True, max_errors=2)
+    assert len(info.value.errors) == 2
+
+
+def test_parallel_validation_matches_sequential(tmp_path):
+    """Test that splitting a large top-level array across workers finds the same errors."""
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(
+        json.dumps({"type": "array", "minItems": 1, "items": SERVICES_SCHEMA})
+    )
+    data = [{"services": [{"name": "svc", "port": 80}]} for _ in range(1500)]
+    data[10]["services"][0]["port"] = "80"
+    data[1200] = {}
+    sequential = collect_errors(data, schema_path, max_errors=None)
+    parallel = collect_errors(data, schema_path, max_errors=None, workers=2)
+    assert parallel == sequential
+    assert [error["path"] for error in parallel] == ["/10/services/0/port", "/1200"]
+    assert parallel[0]["schema_path"] == (
+        "/items/properties/services/items/properties/port/type"
+    )
+
+
+def test_convert_all_errors(temp_files):
+    """Test that convert() reports every error with all_errors=True."""
+    output_path = temp_files["out"].with_suffix(".yaml")
+    with pytest.raises(ValueError, match="Schema validation failed with 2 error"):
+        convert(
+            temp_files["json_in"],
+            "json",
+            "yaml",
+            output_path,
+            input_schema=INVALID_SCHEMA_PATH,
+            all_errors=True,
+        )
+    assert not output_path.exists()
+
+
+# --- Split/Join Tests --- #
+
+
+def test_split_and_join_sections(temp_files):
+    """Test sharding a config per top-level section and joining it back."""
+    shard_dir = temp_files["out"].parent / "shards"
+    convert(temp_files["yaml_in"], "yaml", "json", shard_dir, split_by=".", workers=3)
+    assert sorted(p.name for p in shard_dir.iterdir()) == [
+        "api_settings.json",
+        "database.json",
+        "feature_flags.json",
+    ]
+    assert load_config(shard_dir / "database.json", "json") == SAMPLE_DATA["database"]
+
+    output_path = temp_files["out"].with_suffix(".yaml")
+    convert(shard_dir, "json", "yaml", output_path, join=True, workers=3)
+    assert load_config(output_path, "yaml") == SAMPLE_DATA
+
+
+def test_split_by_nested_path_same_format(tmp_path):
+    """Test splitting a nested list into same-format shards and joining under a path."""
+    data = {"cluster": {"services": [{"name": "web"}, {"name": "db"}]}}
+    input_path = tmp_path / "input.json"
+    input_path.write_text(json.dumps(data))
+    shard_dir = tmp_path / "shards"
+    convert(input_path, "json", "json", shard_dir, split_by="cluster.services")
+    assert load_config(shard_dir / "1.json", "json") == {"name": "db"}
+
+    output_path = tmp_path / "joined.json"
+    convert(
+        shard_dir, "json", "json", output_path, join=True, split_by="cluster.services"
+    )
+    assert load_config(output_path, "json") == data
+
+
+def test_split_errors(temp_files):
+    """Test invalid split paths and sections that cannot be written."""
+    out_dir = temp_files["out"].parent / "shards"
+    with pytest.raises(ValueError, match="not found"):
+        convert(temp_files["json_in"], "json", "yaml", out_dir, split_by="missing")
+    with pytest.raises(ValueError, match="'feature_flags' is not a mapping"):
+        convert(temp_files["json_in"], "json", "toml", out_dir, split_by=".")
+    with pytest.raises(ValueError, match="must be a directory"):
+        convert(temp_files["json_in"], "json", "yaml", out_dir, join=True)
+    with pytest.raises(ValueError, match="cannot be combined with split"):
+        convert(
+            temp_files["yaml_in"],
+            "yaml",
+            "json",
+            out_dir,
+            multi_document=True,
+            split_by=".",
+        )
+
+
+def test_split_rejects_colliding_shard_names(tmp_path):
+    """Test that sections mapping to the same shard file are refused."""
+    out_dir = tmp_path / "shards"
+    with pytest.raises(ValueError, match="'a/b' and 'a_b' would both be written"):
+        split_config({"a/b": {"x": 1}, "a_b": {"y": 2}}, out_dir, "json")
+    with pytest.raises(ValueError, match="would both be written to 'DB.json'"):
+        split_config({"db": {"x": 1}, "DB": {"y": 2}}, out_dir, "json")
+    assert not out_dir.exists()
+
+
+# --- Interning Tests --- #
+
+
+def test_intern_table_is_bounded():
+    """Test that the table stops growing once full and skips long values."""
+    table = InternTable(max_entries=2, max_value_length=4)
+    first = table.key("".join(["ho", "st"]))
+    assert table.key("".join(["h", "ost"])) is first
+    table.key("port")
+    overflow = "".join(["us", "er"])
+    assert table.key(overflow) is overflow
+    assert len(table) == 2
+    long_value = "x" * 5
+    assert table.value(long_value) is long_value
+    assert table.value(5432) == 5432
+
+
+@pytest.mark.parametrize("format", ["json", "xml", "yaml"])
+def test_loaders_intern_keys_and_values(temp_files, format):
+    """Test that repeated keys and values share one object across files."""
+    table = InternTable()
+    first = load_config(temp_files[f"{format}_in"], format, intern_table=table)
+    second = load_config(temp_files[f"{format}_in"], format, intern_table=table)
+    if format == "xml":
+        first, second = first["config"]["database"], second["config"]["database"]
+    else:
+        first, second = first["database"], second["database"]
+    assert first == second
+    assert list(first)[0] is list(second)[0]
+    assert first["user"] is second["user"]
+
+
+def test_convert_with_interning(temp_files):
+    """Test that interning does not change conversion output."""
+    output_path = temp_files["out"].with_suffix(".json")
+    convert(temp_files["xml_in"], "xml", "json", output_path, intern_strings=True)
+    assert load_config(output_path, "json") == XML_SAMPLE_DATA_FROM_STR
+
+
+# --- Format Detection Tests --- #
+
+
+def test_detect_format_from_extension(temp_files, tmp_path):
+    """Test detection from known extensions without reading the file."""
+    for format in ("json", "yaml", "toml", "env", "ini", "xml"):
+        assert detect_format(temp_files[f"{format}_in"]) == format
+    assert detect_format(tmp_path / "settings.yml") == "yaml"
+    assert detect_format(tmp_path / ".env") == "env"
+    assert detect_format(tmp_path / ".env.local") == "env"
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (b'\xef\xbb\xbf<?xml version="1.0"?><config/>', "xml"),
+        (b'{"database": {"port": 5432}}', "json"),
+        (b'[{"name": "web"}]', "json"),
+        (b"# Settings\ndatabase:\n  host: localhost\n", "yaml"),
+        (b"---\n- a\n- b\n", "yaml"),
+        (b'[database]\nhost = "localhost"\nport = 5432\n', "toml"),
+        (b'title = "app"\n\n[[servers]]\nname = "a"\n', "toml"),
+        (b'["quoted key"]\nname = "a"\n', "toml"),
+        (b'["a", "b"]\n', "json"),
+        (b"[database]\nhost = localhost\nport = 5432\n", "ini"),
+        (b"; comment\n[database]\nport = 5432\n", "ini"),
+        (b"DATABASE_HOST=localhost\nDATABASE_PORT=5432\n", "env"),
+        (b"export API_KEY=abc\n", "env"),
+    ],
+)
+def test_detect_format_by_sniffing(tmp_path, content, expected):
+    """Test content sniffing for files without a known extension."""
+    p = tmp_path / "config"
+    p.write_bytes(content)
+    assert detect_format(p) == expected
+
+
+def test_detect_format_reads_only_the_head(tmp_path):
+    """Test that sniffing stops after the first few KB."""
+    p = tmp_path / "large.conf"
+    p.write_text("[section]\nkey = value\n" + "x" * 100_000)
+    assert detect_format(p, sniff_bytes=64) == "ini"
+    p.write_text("\n\n")
+    with pytest.raises(ValueError, match="Could not detect the format"):
+        detect_format(p)
+
+
+def test_convert_with_auto_source_format(tmp_path):
+    """Test convert() with source_format='auto'."""
+    p = tmp_path / "app.conf"
+    p.write_text("[server]\nhost = example.com\n")
+    output_path = tmp_path / "output.json"
+    assert convert(p, "auto", "json", output_path) == "ini"
+    assert load_config(output_path, "json") == {"server": {"host": "example.com"}}
+
+
+# --- Parse Limits Tests --- #
+
+
+def test_limits_reject_yaml_alias_bomb(tmp_path):
+    """Test that aliases are counted at their expanded size."""
+    lines = ["a0: &a0 [x, x, x, x, x, x, x, x, x, x]"]
+    for i in range(1, 9):
+        lines.append(f"a{i}: &a{i} [" + ", ".join([f"*a{i - 1}"] * 10) + "]")
+    p = tmp_path / "bomb.yaml"
+    p.write_text("\n".join(lines) + "\n")
+    with pytest.raises(LimitExceededError, match="maximum of 1000000 values"):
+        load_config(p, "yaml", limits=UNTRUSTED_LIMITS)
+    with pytest.raises(LimitExceededError, match="2 YAML aliases"):
+        load_config(p, "yaml", limits=ParseLimits(max_aliases=2))
+
+
+@pytest.mark.parametrize(
+    "filename, format, content",
+    [
+        ("deep.json", "json", "[" * 100 + "]" * 100),
+        ("deep.toml", "toml", "a = " + "[" * 100 + "]" * 100 + "\n"),
+        ("deep.yaml", "yaml", "[" * 100 + "]" * 100 + "\n"),
+        ("deep.xml", "xml", "<a>" * 100 + "</a>" * 100),
+    ],
+)
+def test_limits_reject_deep_nesting(tmp_path, filename, format, content):
+    """Test that deeply nested inputs fail before the tree is built."""
+    p = tmp_path / filename
+    p.write_text(content)
+    with pytest.raises(LimitExceededError, match="nesting depth of 64"):
+        load_config(p, format, limits=UNTRUSTED_LIMITS)
+
+
+def test_limits_count_toml_table_headers(tmp_path):
+    """Test that table headers and dotted keys count toward the depth limit."""
+    p = tmp_path / "headers.toml"
+    p.write_text("[a.b.c.d]\nx = 1\n")
+    with pytest.raises(LimitExceededError, match="nesting depth of 3"):
+        load_config(p, "toml", limits=ParseLimits(max_depth=3))
+    assert load_config(p, "toml", limits=ParseLimits(max_depth=5))["a"]["b"]
+    p.write_text("a.b.c.d = 1\n")
+    with pytest.raises(LimitExceededError, match="nesting depth of 3"):
+        load_config(p, "toml", limits=ParseLimits(max_depth=3))
+    p.write_text("[" + ".".join(["k"] * 80) + "]\nx = 1\n")
+    with pytest.raises(LimitExceededError, match="nesting depth of 64"):
+        load_config(p, "toml", limits=UNTRUSTED_LIMITS)
+
+
+def test_limits_reject_xml_dtd(tmp_path):
+    """Test that XML document type declarations are refused by default."""
+    p = tmp_path / "dtd.xml"
+    p.write_text('<!DOCTYPE r [<!ENTITY e "x">]><r>&e;</r>')
+    with pytest.raises(LimitExceededError, match="DTDs"):
+        load_config(p, "xml", limits=UNTRUSTED_LIMITS)
+    with pytest.raises(LimitExceededError, match="DTDs"):
+        load_config(p, "xml", streaming=True, limits=UNTRUSTED_LIMITS)
+
+
+def test_limits_reject_large_input(tmp_path, temp_files):
+    """Test the size and value limits on a regular input."""
+    p = temp_files["json_in"]
+    with pytest.raises(LimitExceededError, match="exceeds the limit of 10 bytes"):
+        load_config(p, "json", limits=ParseLimits(max_input_bytes=10))
+    with pytest.raises(LimitExceededError):
+        convert(
+            p, "json", "yaml", tmp_path / "out.yaml", limits=ParseLimits(max_nodes=5)
+        )
+    assert not (tmp_path / "out.yaml").exists()
+
+
+def test_limits_count_flat_format_values(tmp_path):
+    """Test the value limit for .env and INI inputs."""
+    p = tmp_path / ".env"
+    p.write_text("A__B=1\nA__C=2\nD=3\n")
+    assert load_config(p, "env", separator="__", limits=ParseLimits(max_nodes=5))
+    with pytest.raises(LimitExceededError, match="maximum of 4 values"):
+        load_config(p, "env", separator="__", limits=ParseLimits(max_nodes=4))
+    with pytest.raises(LimitExceededError, match="nesting depth of 1"):
+        load_config(p, "env", separator="__", limits=ParseLimits(max_depth=1))
+
+
+def test_limits_cap_interpolation(tmp_path):
+    """Test that doubling references cannot expand into huge strings."""
+    lines = ['a0 = "0123456789"']
+    lines += [f'a{i} = "${{a{i - 1}}}${{a{i - 1}}}"' for i in range(1, 40)]
+    p = tmp_path / "expand.toml"
+    p.write_text("\n".join(lines) + "\n")
+    with pytest.raises(LimitExceededError, match="limit of 16777216 characters"):
+        convert(
+            p,
+            "toml",
+            "json",
+            tmp_path / "out.json",
+            interpolate=True,
+            limits=UNTRUSTED_LIMITS,
+        )
+    data = {"a": "${b}${b}", "b": "xyz"}
+    with pytest.raises(LimitExceededError, match="5 characters at 'a'"):
+        interpolate_config(data, limits=ParseLimits(max_interpolated_length=5))
+
+
+@pytest.mark.parametrize("format", ["json", "yaml", "toml", "env", "ini", "xml"])
+def test_untrusted_limits_accept_regular_files(temp_files, format):
+    """Test that ordinary configs load unchanged under UNTRUSTED_LIMITS."""
+    p = temp_files[f"{format}_in"]
+    assert load_config(p, format, limits=UNTRUSTED_LIMITS) == load_config(p, format)